@@ -0,0 +1,200 @@
+"""
+Micro-benchmarks for the game's hot paths, kept out of the game modules.
+
+    python bench/bench.py                 # list benchmarks
+    python bench/bench.py party_stats [rounds]
+    python bench/bench.py savefmt [n_items]
+    python bench/bench.py item_memory [n_defs]
+    python bench/bench.py wrap [rounds]
+    python bench/bench.py loadout [n_items] [check]
+
+Runs headless (SDL dummy drivers); numbers are best/average wall time on this machine.
+"""
+import os, sys, time, random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+BENCHES = {}
+
+def bench(fn):
+    BENCHES[fn.__name__] = fn
+    return fn
+
+def per_call_us(fn, rounds):
+    t0 = time.perf_counter()
+    for _ in range(rounds): fn()
+    return (time.perf_counter() - t0) / rounds * 1e6
+
+@bench
+def party_stats(rounds=20000):
+    """StatSheet build (uncached / cached) vs the per-member Hero stat calls it replaces."""
+    from core.entities import Hero
+    from core.party_stats import PartyStats
+    from data.inventory import EQUIP_SLOTS, ITEM_INDEX, ATTACK, MAGIC, DEFENSE, AGILITY
+    rng = random.Random(1)
+    party = [Hero(c, c.title()) for c in ("FIGHTER", "THIEF", "BLACK_MAGE", "WHITE_MAGE")]
+    for m in party:
+        for s in EQUIP_SLOTS:
+            pool = ITEM_INDEX.by_slot(s)
+            if pool: m.equipment[s] = rng.choice(pool)
+    cand = rng.choice(ITEM_INDEX.by_slot("weapon"))
+    ps = PartyStats()
+    sh = ps.build(party, cand)
+    assert [(sh.total(i, ATTACK), sh.total(i, MAGIC), sh.total(i, DEFENSE), sh.total(i, AGILITY),
+             sh.resist(i, "FIRE")) for i, m in enumerate(party)] == \
+           [(m.attack(), m.magic(), m.defense(), m.agility(), m.resistance("FIRE")) for m in party]
+
+    def per_member():
+        for m in party:
+            (m.attack(), m.magic(), m.defense(), m.agility(), m.max_hp(), m.max_mp(),
+             [m.resistance(r) for r in ("FIRE", "ICE", "ELECTRIC", "POISON")])
+
+    for name, fn in (("per-member Hero calls", per_member),
+                     ("sheet build + delta", lambda: ps.build(party, cand)),
+                     ("cached sheet", lambda: ps.sheet(party, cand))):
+        print(f"{name:24s} {per_call_us(fn, rounds):8.2f} us/party")
+
+def stress_hero(n_items):
+    """Leader + 3 companions carrying n_items distinct affixed defs plus every static item."""
+    from core.entities import Hero
+    from data.inventory import ITEMS, DYNAMIC_ITEMS, ITEM_INDEX
+    hero = Hero("FIGHTER", "Stress")
+    for cls in ("THIEF", "BLACK_MAGE", "WHITE_MAGE"):
+        comp = Hero(cls, cls.title()); comp.party = hero.party; hero.party.append(comp)
+    bases = sorted(ITEM_INDEX.by_kind("equipment", dynamic=False))
+    for iid in sorted(ITEM_INDEX.static_ids()):
+        hero.inventory.add(iid, 9)
+    for k in range(n_items):
+        base = ITEMS[bases[k % len(bases)]]
+        iid = f"{base.id}#B{k}"
+        if iid not in ITEMS:
+            DYNAMIC_ITEMS.register(base.clone_with(iid, f"{base.name} +{k % 10}", {"attack": k % 7, "defense": k % 3},
+                                                   1.0 + (k % 5) / 4, "RARE"))
+        hero.inventory.add(iid, 1 + k % 3)
+    return hero
+
+@bench
+def savefmt(n_items=2000, rounds=5):
+    """Binary (zlib) save codec vs JSON: size and best-of save/load time on a stress save."""
+    import json
+    from core import savefmt as codec
+    from core.gamedata import snapshot_save, SAVE_VERSION
+    data = snapshot_save(stress_hero(n_items))
+    def best(fn):
+        t, out = float("inf"), None
+        for _ in range(rounds):
+            t0 = time.perf_counter(); out = fn(); t = min(t, time.perf_counter() - t0)
+        return t, out
+    ts, js = best(lambda: json.dumps(data).encode())
+    tl, _ = best(lambda: json.loads(js))
+    rows = [("json", len(js), ts, tl)]
+    ts, blob = best(lambda: codec.dumps(data, SAVE_VERSION))
+    tl, back = best(lambda: codec.loads(blob))
+    assert back == json.loads(js), "round trip mismatch"
+    rows.append(("binary+zlib", len(blob), ts, tl))
+    print(f"stress save: {len(data['inventory'])} inventory ids, {len(data['dynamic_items'])} dynamic defs")
+    print(f"{'format':<12} {'bytes':>10} {'save ms':>9} {'load ms':>9}")
+    for name, size, ts, tl in rows:
+        print(f"{name:<12} {size:>10} {ts*1e3:>9.2f} {tl*1e3:>9.2f}")
+
+@bench
+def item_memory(n=5000):
+    """Bytes and clone time per affixed def: slots + stat vector vs the old plain-class + stats-dict layout."""
+    import gc, tracemalloc
+    from data.inventory import ITEMS, ITEM_INDEX, AFFIX_PREFIXES, AFFIX_SUFFIXES, _VECTORS
+    class DictItemDef:  # the pre-slots layout, for comparison
+        def __init__(self, id, name, kind, price=10, desc="", slot=None, stats=None, use_effect=None,
+                     unlock_spell=None, value=0, quality="COMMON", dynamic=False):
+            self.id=id; self.name=name; self.kind=kind; self.price=price; self.desc=desc
+            self.slot=slot; self.stats=stats or {}
+            self.use_effect=use_effect; self.unlock_spell=unlock_spell; self.value=value
+            self.quality=quality; self.dynamic=dynamic
+    bases = [ITEMS[i] for i in sorted(ITEM_INDEX.by_kind("equipment", dynamic=False))]
+    affixes = [a["stats"] for a in AFFIX_PREFIXES + AFFIX_SUFFIXES]
+    ids = [f"{bases[k % len(bases)].id}#B{k}" for k in range(n)]
+    names = [f"{bases[k % len(bases)].name} {k}" for k in range(n)]  # strings excluded from both
+    def measure(make):
+        gc.collect(); tracemalloc.start()
+        defs = [make(k) for k in range(n)]
+        gc.collect()  # a full collection also empties the tuple/dict free lists, which tracemalloc counts as live
+        cur = tracemalloc.get_traced_memory()[0]; tracemalloc.stop()
+        gc.collect(); t0 = time.perf_counter()  # untraced timing (tracemalloc slows allocation)
+        for k in range(n): make(k)
+        return cur / n, (time.perf_counter() - t0) / n * 1e6
+    def legacy(k):
+        b = bases[k % len(bases)]; merged = dict(b.stats)
+        for s, v in affixes[k % len(affixes)].items(): merged[s] = merged.get(s, 0) + v
+        return DictItemDef(ids[k], names[k], b.kind, int(b.price * 1.3), b.desc, b.slot, merged,
+                           quality="RARE", dynamic=True)
+    def current(k):
+        b = bases[k % len(bases)]
+        return b.clone_with(ids[k], names[k], affixes[k % len(affixes)], 1.3, "RARE")
+    rows = [("dict + __dict__", *measure(legacy)), ("slots + vector", *measure(current))]
+    print(f"{n} affixed defs ({len(_VECTORS)} distinct stat vectors interned)")
+    print(f"{'layout':<16} {'bytes/def':>10} {'us/clone':>9}")
+    for name, size, us in rows:
+        print(f"{name:<16} {size:>10.0f} {us:>9.2f}")
+
+@bench
+def wrap(rounds=200):
+    """Help-text wrap: naive (font.size per word) vs cached word widths vs memoized wrap_text."""
+    import pygame as pg
+    pg.init()
+    from settings import FONT, TEXT_METRICS, wrap_text
+    from ui.help_overlay import HELP_LINES
+    from core.wrap_reference import wrap_text_naive
+    widths = list(range(160, 880, 40))
+    texts = [ln for ln in HELP_LINES if ln and not ln.endswith(":")]
+    def run(fn):
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            for w in widths:
+                for t in texts: fn(t, FONT, w)
+        return (time.perf_counter() - t0) / (rounds * len(widths)) * 1e3
+    for w in widths:
+        for t in texts:
+            assert TEXT_METRICS._wrap(t, FONT, w) == wrap_text_naive(t, FONT, w), (t, w)
+    naive = run(wrap_text_naive)
+    checks = TEXT_METRICS.exact_checks
+    cold = run(TEXT_METRICS._wrap)  # word widths cached, no memo
+    checks = (TEXT_METRICS.exact_checks - checks) / (rounds * len(widths))
+    warm = run(wrap_text)
+    print(f"help text ({len(texts)} lines) per full wrap: naive {naive:.3f} ms, "
+          f"word-cache {cold:.3f} ms ({naive/cold:.1f}x, {checks:.0f} font.size calls), "
+          f"memoized {warm:.4f} ms ({naive/warm:.0f}x)")
+
+@bench
+def loadout(n_items=300, check=0):
+    """Loadout optimizer on a four-member party over n random affixed items (check=1: vs brute force)."""
+    from core.loadout import optimize
+    from core.sim import build_party
+    from data.inventory import ITEM_INDEX, generate_affixed_equipment
+    rng = random.Random(5)
+    bases = ITEM_INDEX.by_kind("equipment", dynamic=False)
+    party = build_party(["FIGHTER", "THIEF", "BLACK_MAGE", "WHITE_MAGE"], level=10)
+    counts = {}
+    for _ in range(n_items):
+        iid = generate_affixed_equipment(rng.choice(bases), rng)
+        counts[iid] = counts.get(iid, 0) + 1
+    for prune in (True, False) if check else (True,):
+        if not prune:  # exhaustive search is only feasible for a few items
+            counts = dict(list(counts.items())[:14])
+            ref = optimize(party, counts)
+        t = min(optimize(party, counts, prune=prune).ms for _ in range(5))
+        lo = optimize(party, counts, prune=prune)
+        print(f"{'pruned' if prune else 'exhaustive':10s} items={lo.pool_items:4d} options={lo.candidates:5d} "
+              f"nodes={lo.nodes:8d} score={lo.score:8.2f} best of 5: {t:7.2f} ms")
+        if not prune:
+            print("pruned == exhaustive:", abs(ref.score - lo.score) < 1e-9)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in BENCHES:
+        for name, fn in BENCHES.items(): print(f"{name:14s} {fn.__doc__.strip()}")
+        return
+    BENCHES[argv[0]](*map(int, argv[1:]))
+
+if __name__ == "__main__":
+    main()
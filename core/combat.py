@@ -0,0 +1,440 @@
+import random
+from collections import deque
+from settings import clamp, type_multiplier
+from core.entities import Enemy
+from data.spells import get_spell
+from data.inventory import use_item
+from core.loot import LOOT_TABLES, EQUIP_DROPS, roll_loot
+
+LOG_LIMIT = 200  # messages kept per battle (ring buffer)
+
+def damage_from_attack(attacker_atk, defender_def, rng=random):
+    return max(1, attacker_atk + rng.randrange(4, 11) - defender_def)  # == randint(4, 10), one call less
+
+_LEVEL_VARIANCE = (-1, 0, 0, 1)
+
+def roll_encounter(hero, rng=random, species=None):
+    """
+    Enemy group for an encounter, tuned by hero level & party maturity.
+    `species` (balance tools only) replaces the species pool; sizes/levels roll as usual.
+    """
+    # --- NEW Encounter scaling / gating ---
+    hero_lv = hero.level()
+    party_high_lvl = sum(1 for m in getattr(hero, "party", [hero]) if m.level() > 2)
+    allow_golem = (hero_lv >= 4) or (party_high_lvl > 2)
+    allow_dragon = (hero_lv >= 10)
+
+    # Max group size by hero level
+    if hero_lv < 3:
+        max_group = 2
+    elif hero_lv < 5:
+        max_group = 3
+    elif hero_lv < 10:
+        max_group = 4
+    else:
+        max_group = 5
+
+    # Early game (tutorial feel): only level‑1 goblins
+    enemies = []
+    if hero_lv < 3:
+        count = 1 if rng.random() < 0.55 else 2
+        for _ in range(count):
+            enemies.append(Enemy(rng.choice(species) if species else "GOBLIN", level=1))
+        return enemies
+
+    # Build weighted species pool
+    weights = []
+    def add(spec, w):
+        weights.append((spec, w))
+    add("GOBLIN", 6)
+    add("WOLF", 5)
+    add("SLIME", 5)
+    add("BAT", 4)
+    if allow_golem:
+        add("GOLEM", 2)
+    if allow_dragon:
+        add("DRAGON", 1)  # very rare
+    if species:
+        weights = [(sp, 1) for sp in species]
+    # Normalize pick function
+    total_w = sum(w for _, w in weights)
+    def pick_species():
+        r = rng.random() * total_w
+        acc = 0
+        for sp, w in weights:
+            acc += w
+            if r <= acc:
+                return sp
+        return weights[-1][0]
+
+    # Group size distribution (bias smaller groups slightly)
+    possible_sizes = list(range(1, max_group + 1))
+    size_weights = [max(1, (max_group + 1 - s)) for s in possible_sizes]
+    sw_total = sum(size_weights)
+    r = rng.random() * sw_total
+    acc = 0
+    group_size = 1
+    for s, w in zip(possible_sizes, size_weights):
+        acc += w
+        if r <= acc:
+            group_size = s
+            break
+
+    for _ in range(group_size):
+        sp = pick_species()
+        # Level variance (post early game). Avoid > hero_lv+2 for pacing.
+        var = rng.choice(_LEVEL_VARIANCE)
+        lvl = clamp(hero_lv + var, 1, hero_lv + 2)
+        # Slight downscale for GOLEM/DRAGON appearing early in their unlock range
+        if sp == "GOLEM" and lvl < hero_lv:
+            lvl = hero_lv  # keep tough
+        if sp == "DRAGON":
+            lvl = max(10, lvl + 1)  # ensure intimidating baseline
+        enemies.append(Enemy(sp, lvl))
+    return enemies
+
+def steal_pool(species):
+    """(item_id, weight) a Steal can roll against this species (consumable + equipment loot)."""
+    return [(item_id, ch) for item_id, ch, _ in LOOT_TABLES.get(species, [])] + \
+           [(item_id, ch) for item_id, ch in EQUIP_DROPS.get(species, [])]
+
+def _max_hp(ent):
+    # Enemy.max_hp is a plain int, Hero.max_hp() a method
+    m = ent.max_hp
+    return m() if callable(m) else m
+
+class CombatEngine:
+    """
+    Display-free combat rules (attack, steal, spells, items, enemy phase, status ticks, loot).
+    Battle layers menus, drawing and sound on top; the balance simulator drives it directly.
+    All randomness goes through self.rng (module `random` unless a seeded Random is given).
+    """
+    def __init__(self, hero, enemies=None, rng=None):
+        self.rng = rng or random
+        self.hero = hero
+        self.turn = "PLAYER"
+        self.log = deque(maxlen=LOG_LIMIT)
+        self.verbose = True  # False: skip building log text (balance runs discard it)
+
+        self.enemies = enemies if enemies is not None else roll_encounter(hero, self.rng)
+        self.total_xp_yield = sum(e.xp_yield for e in self.enemies)
+        self.cursor = 0
+
+        # PARTY: hero + companions (up to 3)
+        self.companions = [m for m in getattr(hero, "party", [hero]) if m is not hero][:3]
+        self.party = [self.hero] + self.companions
+        self.active_index = 0  # whose turn within party round
+
+        self.victory_loot_done = False
+        self.ran_away = False        # NEW: true if player fled
+        self.loot_items: dict = {}   # last victory loot (item_id -> qty)
+        self.loot_gold = 0
+
+    # ----- presentation hooks (no-ops headless; Battle overrides) -----
+    def _beep(self, freq, dur): pass
+    def _shake(self, t): pass
+    def _on_party_turn(self): pass   # a new party member is up
+
+    # ----- properties -----
+    @property
+    def active_actor(self):
+        # Skip dead actors if any linger
+        if self.active_index >= len(self.party):
+            self.active_index = 0
+        a = self.party[self.active_index]
+        if a.hp > 0: return a
+        # ensure current points to a living member
+        loops = 0
+        while loops < len(self.party) and not self.party[self.active_index].is_alive():
+            self.active_index = (self.active_index + 1) % len(self.party)
+            loops += 1
+        return self.party[self.active_index]
+
+    # ---------- helpers ----------
+    def alive_enemies(self):
+        return [e for e in self.enemies if e.hp > 0]
+
+    def target(self):
+        alive = self.alive_enemies()
+        if not alive:
+            return None
+        self.cursor %= len(alive)
+        return alive[self.cursor]
+
+    def _party_alive(self):
+        return [m for m in self.party if m.hp > 0]
+
+    def is_over(self):
+        return (self.ran_away or not any(e.hp > 0 for e in self.enemies)
+                or not any(m.hp > 0 for m in self.party))
+
+    # --- party flow helpers ---
+    def _advance_turn(self):
+        # Rotates through living party; wraps to enemy phase when hero cycles.
+        # If enemies all dead -> end
+        if not self.alive_enemies():
+            self.turn = "ENEMY"  # triggers end sequence path
+            return
+        # Move to next living party member; wrapping past the end -> enemies phase
+        # (checked by position, so a fallen leader can't leave the party acting forever)
+        nxt = next((i for i in range(self.active_index + 1, len(self.party)) if self.party[i].is_alive()), None)
+        if nxt is None:
+            self.active_index = 0
+            self.turn = "ENEMY"
+        else:
+            self.active_index = nxt
+            self.turn = "PLAYER"
+            self._on_party_turn()
+
+    # ---------- actions ----------
+    def player_attack(self):
+        a = self.active_actor
+        t = self.target()
+        if not t:
+            self.log.append("No target.")
+            return
+        dmg = damage_from_attack(a.attack(), 4 + t.level, self.rng)
+        t.hp = max(0, t.hp - dmg)  # dmg >= 1 and enemy hp never exceeds max_hp
+        if t.hp == 0:
+            self.hero.quest.record_kill(t.species)
+        if self.verbose: self.log.append(f"{a.name} strikes {t.species} for {dmg}.")
+        self._beep(700, 70)
+        self._shake(0.15)
+        self._advance_turn()
+
+    def player_defend(self):
+        a = self.active_actor
+        a.defending = True
+        self.log.append(f"{a.name} braces (DEFEND).")
+        self._advance_turn()
+
+    def player_run(self):
+        # only hero can attempt run
+        if self.active_actor is not self.hero:
+            self.log.append("Only leader can Run.")
+            return
+        avg = max(1, sum(e.level for e in self.enemies) // len(self.enemies))
+        chance = clamp(0.5 + 0.05 * (self.hero.level() - avg), 0.1, 0.95)
+        if self.rng.random() < chance:
+            self.log.append("Party fled successfully!")
+            self.ran_away = True
+            # Clear enemies logically (no loot/xp)
+            for e in self.enemies:
+                e.hp = 0
+            self.turn = "ENEMY"
+        else:
+            self.log.append("Could not flee!")
+            self._advance_turn()
+
+    # --- NEW: steal attempt (THIEF only) ---
+    def player_steal(self):
+        # Weighted table roll merges consumable + equipment loot pools.
+        # Returns True when something was stolen, False otherwise.
+        a = self.active_actor
+        if a.hero_class != "THIEF":
+            self.log.append("Cannot Steal.")
+            return False
+        tgt = self.target()
+        if not tgt:
+            self.log.append("No target.")
+            return False
+        # success chance: base 55% + (agility diff *1.5%) capped
+        diff = a.agility() - (10 + tgt.level)
+        chance = clamp(0.55 + diff * 0.015, 0.10, 0.90)
+        if self.rng.random() > chance:
+            self.log.append("Steal failed.")
+            self._advance_turn()
+            return False
+        pool = steal_pool(tgt.species)
+        if not pool:
+            self.log.append("Nothing to steal.")
+            self._advance_turn()
+            return False
+        # weighted pick
+        total = sum(c for _, c in pool)
+        r = self.rng.random() * total
+        acc = 0
+        picked = pool[0][0]
+        for iid, ch in pool:
+            acc += ch
+            if r <= acc:
+                picked = iid
+                break
+        self.hero.inventory.add(picked, 1)  # shared inventory
+        self.log.append(f"Stole {picked}!")
+        self._advance_turn()
+        return True
+
+    def cast_spell(self, spell_id: str):
+        a = self.active_actor
+        if not a.can_cast(spell_id):
+            self.log.append("Cannot cast that.")
+            return
+        sp = get_spell(spell_id)
+        if a.mp < sp["mp"]:
+            self.log.append("Not enough MP.")
+            self._beep(300, 120)
+            return
+        a.mp -= sp["mp"]
+
+        # Healing (ally)
+        if sp["target"] == "ally":
+            before = a.hp
+            a.hp = clamp(a.hp + sp["power"] + int(a.magic() * 0.6), 0, a.max_hp())
+            self.log.append(f"{sp['name']} heals {a.hp - before} HP.")
+            self._advance_turn()
+            return
+
+        # Target selection
+        if sp["aoe"]:
+            targets = self.alive_enemies()
+        else:
+            tgt = self.target()
+            if not tgt:
+                self.log.append("No target.")
+                return
+            targets = [tgt]
+
+        apply = sp.get("apply_status")
+        parts = []
+        for t in targets:
+            dmg = 0
+            mult = 1.0  # ensure defined for logging (fix Pylance warning)
+            if sp["power"] > 0:
+                base = sp["power"] + int(a.magic() * 0.8) + self.rng.randint(0, 6)
+                # Mastery bonus
+                if sp["type"]:
+                    base += a.spell_mastery.get(sp["type"].upper(), 0) * 4
+                    if hasattr(t, "type"):
+                        mult = type_multiplier(sp["type"], t.type)
+                dmg = max(1, int(base * mult))
+                # Apply (enemies currently have no elemental resist stat)
+                t.hp = clamp(t.hp - dmg, 0, t.max_hp)
+                if t.hp == 0:
+                    self.hero.quest.record_kill(t.species)
+            # Status effect (offensive only)
+            if apply and t.hp > 0:
+                store = getattr(t, "status_effects", None)
+                if store is not None:
+                    sid = apply["id"]
+                    store[sid] = {"dur": apply["dur"], "pot": apply["pot"]}
+                    self.log.append(f"{sid} inflicted on {t.species}.")
+            if dmg > 0:
+                tag = f"{t.species}:{dmg}"
+                if sp["type"] and mult != 1.0:
+                    if mult > 1.0: tag += " (weak)"
+                    elif mult < 1.0: tag += " (resist)"
+                parts.append(tag)
+
+        if parts:
+            self.log.append(f"{sp['name']} → " + " | ".join(parts))
+            self._beep(1000, 90)
+
+        self._shake(0.18)
+        self._advance_turn()
+
+    def use_item(self, item_id: str):
+        # Shared inventory (classic style)
+        msg = use_item(self.active_actor, item_id)
+        self.log.append(msg)
+        if "Used" in msg or "Learned" in msg:
+            self._beep(1000, 90)
+        self._advance_turn()
+
+    # enemies_turn modified to target any living party member
+    def enemies_turn(self):
+        # Each living enemy picks a random living party target.
+        total_log = [] if self.verbose else None
+        living = self._party_alive()
+        for e in self.alive_enemies():
+            if not living: break
+            target = self.rng.choice(living)
+            dmg = damage_from_attack(e.attack, target.defense(), self.rng)
+            if target.defending:
+                dmg = max(1, dmg // 2)
+            target.hp = clamp(target.hp - dmg, 0, target.max_hp())
+            if target.hp == 0:
+                living = self._party_alive()
+            if total_log is not None: total_log.append(f"{e.species}->{target.name}:{dmg}")
+        if total_log:
+            self.log.append("Enemies act: " + " | ".join(total_log))
+            self._beep(500, 90)
+        for m in self._party_alive():
+            m.defending = False
+        # Reset to first living party member
+        self.active_index = 0
+        self.turn = "PLAYER"
+        self._on_party_turn()
+
+    def process_status_effects(self):
+        # Tick hero
+        if self.hero.status_effects:
+            self._tick_entity_status(self.hero, is_hero=True)
+        # Tick enemies
+        for e in self.enemies:
+            if e.hp > 0 and e.status_effects:
+                self._tick_entity_status(e, is_hero=False)
+
+    def _tick_entity_status(self, ent, is_hero: bool):
+        if not getattr(ent, "status_effects", None): return
+        expired = []
+        for sid, data in ent.status_effects.items():
+            data["dur"] -= 1
+            if sid == "POISON":
+                mx = _max_hp(ent)
+                amt = max(3, int(mx * 0.05))
+                ent.hp = clamp(ent.hp - amt, 0, mx)
+                if is_hero: self.log.append(f"Poison deals {amt} to you.")
+            elif sid == "BURN":
+                mx = _max_hp(ent)
+                amt = max(4, int(mx * 0.06))
+                ent.hp = clamp(ent.hp - amt, 0, mx)
+            elif sid == "REGEN":
+                mx = _max_hp(ent)
+                amt = max(3, int(mx * 0.05))
+                ent.hp = clamp(ent.hp + amt, 0, mx)
+            elif sid == "SLOW":
+                # Simple slow: reduce next enemy total damage (implemented in enemies_turn)
+                pass
+            if data["dur"] <= 0:
+                expired.append(sid)
+        for sid in expired:
+            del ent.status_effects[sid]
+
+    # ---------- flow ----------
+    def end_turn_sequence(self):
+        # On victory: loot once; fleeing skips rewards.
+        if self.alive_enemies():
+            self.enemies_turn()
+        else:
+            if self.ran_away:
+                # Skip loot/xp
+                pass
+            else:
+                if not self.victory_loot_done:
+                    items, gold = roll_loot(self.enemies, self.rng)
+                    self.loot_items, self.loot_gold = items, gold
+                    if items:
+                        for iid, qty in items.items():
+                            self.hero.inventory.add(iid, qty)
+                        self.log.append("Loot: " + ", ".join([f"{iid} x{q}" for iid, q in items.items()]))
+                    if gold > 0:
+                        self.hero.gil += gold
+                        self.log.append(f"Found {gold} Gil.")
+                    self.victory_loot_done = True
+        self.process_status_effects()
+
+    def award_xp(self):
+        """XP share to all living party members + quest turn-ins; returns log lines."""
+        out = []
+        xp_gain = self.total_xp_yield
+        if xp_gain > 0:
+            living = [m for m in self.party if m.is_alive()]
+            share = max(1, xp_gain // max(1, len(living)))
+            for m in living:
+                msgs = m.add_xp(share)
+                out.append(f"{m.name} +{share} XP")
+                if m is self.hero:
+                    out.extend(msgs)
+            out.extend(self.hero.quest.turn_in_completed(self.hero))
+        return out
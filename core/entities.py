@@ -1,6 +1,7 @@
 import pygame
 from settings import *
-from data.inventory import Inventory, ITEMS, EQUIP_SLOTS
+from data.inventory import (Inventory, ITEMS, EQUIP_SLOTS, DYNAMIC_ITEMS, STAT_INDEX, N_STATS,
+                            ATTACK, MAGIC, DEFENSE, HP, MP, AGILITY)
 from data.spells import known_default_for, get_spell
 from core.quest import QuestManager
 import random
@@ -13,6 +14,34 @@ CLASS_ALLOWED_SCHOOLS = {
     "THIEF": set(),        # no magic (can Steal)
 }
 
+# Class starter kit (slot -> item id) equipped on a new game
+STARTER_GEAR = {
+    "FIGHTER": {"weapon": "WOOD_SWORD", "armor": "LEATHER_ARM"},
+    "THIEF": {"weapon": "WOOD_SWORD"},
+    "BLACK_MAGE": {"armor": "MAGE_ROBE"},
+    "WHITE_MAGE": {"armor": "MAGE_ROBE"},
+}
+
+class Equipment(dict):
+    """Slot -> item id mapping that notifies its owner on any change (gear stat cache)."""
+    def __init__(self, data=(), on_change=None):
+        super().__init__(data)
+        self._on_change = on_change
+
+    def _changed(self):
+        if self._on_change: self._on_change()
+
+    def __setitem__(self, key, value): super().__setitem__(key, value); self._changed()
+    def __delitem__(self, key): super().__delitem__(key); self._changed()
+    def update(self, *a, **kw): super().update(*a, **kw); self._changed()
+    def clear(self): super().clear(); self._changed()
+    def pop(self, *a):
+        v = super().pop(*a); self._changed(); return v
+    def popitem(self):
+        v = super().popitem(); self._changed(); return v
+    def setdefault(self, key, default=None):
+        v = super().setdefault(key, default); self._changed(); return v
+
 class Hero:
     def __init__(self, hero_class: str = "FIGHTER", name: str = "Hero"):
         # base stats
@@ -40,8 +69,10 @@ class Hero:
         self.defending = False
 
         # gear & inventory
-        # CHANGED: add explicit value type (str | None) so Pylance accepts assigning item ids later.
-        self.equipment: dict[str, str | None] = {slot: None for slot in EQUIP_SLOTS}
+        self._gear: list | None = None   # cached gear stat vector (None = stale)
+        self.gear_rev = 0                # bumped on every equipment change (PartyStats cache key)
+        self._equip_refs = DYNAMIC_ITEMS.holder(self)  # equipped dynamic defs stay alive
+        self.equipment = {slot: None for slot in EQUIP_SLOTS}
         self.inventory = Inventory()
 
         # identity / class
@@ -73,32 +104,49 @@ class Hero:
         self.talent_points = 0
         self.spell_mastery = {"FIRE":0,"ICE":0,"ELECTRIC":0,"WATER":0,"POISON":0}
 
+    # ---- Equipment (observed so gear totals are summed once per change) ----
+    @property
+    def equipment(self) -> Equipment:
+        return self._equipment
+
+    @equipment.setter
+    def equipment(self, value):
+        # Any plain dict assigned (load_game, companion restore) is wrapped.
+        self._equipment = Equipment(value, self._invalidate_gear)
+        self._invalidate_gear()
+
+    def _invalidate_gear(self):
+        self._gear = None
+        self.gear_rev += 1
+        self._equip_refs.reset(self._equipment.values())
+
+    def gear_totals(self) -> list:
+        """Summed stat vector of all equipped items (STAT_KEYS order), cached until gear changes."""
+        g = self._gear
+        if g is None:
+            vecs = [ITEMS[item_id].vec for item_id in self._equipment.values() if item_id]
+            g = self._gear = list(map(sum, zip(*vecs))) if vecs else [0] * N_STATS
+        return g
+
     # ---- Effective stats (base + gear bonuses) ----
-    def _gear_bonus(self, key):
-        total = 0
-        for _, item_id in self.equipment.items():
-            if not item_id: continue
-            total += ITEMS[item_id].stats.get(key, 0)
-        return total
+    def _gear_bonus(self, idx):
+        g = self._gear  # cached vector valid: skip the gear_totals() call
+        return (g if g is not None else self.gear_totals())[idx]
 
     def level(self): return self.base_level
-    def max_hp(self): return self.base_hp + self._gear_bonus("hp")
-    def max_mp(self): return self.base_mp + self._gear_bonus("mp")
-    def attack(self): return self.base_attack + self._gear_bonus("attack")
-    def magic(self): return self.base_magic + self._gear_bonus("magic")
-    def defense(self): return self.base_defense + self._gear_bonus("defense")
-    def agility(self): return self.base_agility + self._gear_bonus("agility")
+    def max_hp(self): return self.base_hp + self._gear_bonus(HP)
+    def max_mp(self): return self.base_mp + self._gear_bonus(MP)
+    def attack(self): return self.base_attack + self._gear_bonus(ATTACK)
+    def magic(self): return self.base_magic + self._gear_bonus(MAGIC)
+    def defense(self): return self.base_defense + self._gear_bonus(DEFENSE)
+    def agility(self): return self.base_agility + self._gear_bonus(AGILITY)
 
     def is_alive(self): return self.hp > 0
 
     def resistance(self, elem: str) -> int:
         """Aggregate percentage resistance (can be negative)."""
-        key = f"res_{elem.upper()}"
-        total = 0
-        for _, item_id in self.equipment.items():
-            if not item_id: continue
-            total += ITEMS[item_id].stats.get(key, 0)
-        return total
+        i = STAT_INDEX.get(f"res_{elem.upper()}")
+        return 0 if i is None else self.gear_totals()[i]
 
     def level_up(self):
         self.base_level += 1
@@ -126,6 +174,13 @@ class Hero:
         if 'POISON' in self.status_effects:
             draw_text(surf, "PSN", rect.centerx - 12, rect.top - 20, POISON_COLOR, FONT_BIG)
 
+    def draw_bounds(self):
+        """Screen area touched by draw() (body, sword bar, status tag)."""
+        rect = pygame.Rect(int(self.x - self.w/2), int(self.y - self.h/2), self.w, self.h)
+        bar = pygame.Rect(rect.right + 6, rect.top + 8, 8, rect.height-16)
+        tag = pygame.Rect(rect.centerx - 12, rect.top - 20, *FONT_BIG.size("PSN"))
+        return rect.union(bar).union(tag)
+
     def draw_at(self, surf, x, y):
         rect = pygame.Rect(int(x - self.w/2), int(y - self.h/2), self.w, self.h)
         pygame.draw.rect(surf, self.color, rect, border_radius=6)
@@ -234,18 +289,22 @@ class Enemy:
         ("DRAGON","DRAGON"),  # NEW high‑level foe (>=10)
     ]
 
+    TYPES = dict(SPECIES)
+    BASE_HP = {
+        "GOBLIN":60,"WOLF":54,"SLIME":52,"BAT":48,"GOLEM":72,
+        "DRAGON":140,  # NEW
+    }
+    BASE_ATK = {
+        "GOBLIN":14,"WOLF":12,"SLIME":10,"BAT":11,"GOLEM":13,
+        "DRAGON":22,   # NEW
+    }
+
     def __init__(self, kind, level=1):
         self.species = kind
-        self.type = dict(self.SPECIES)[kind]
-
-        base_hp = {
-            "GOBLIN":60,"WOLF":54,"SLIME":52,"BAT":48,"GOLEM":72,
-            "DRAGON":140,  # NEW
-        }[kind]
-        base_atk = {
-            "GOBLIN":14,"WOLF":12,"SLIME":10,"BAT":11,"GOLEM":13,
-            "DRAGON":22,   # NEW
-        }[kind]
+        self.type = self.TYPES[kind]
+
+        base_hp = self.BASE_HP[kind]
+        base_atk = self.BASE_ATK[kind]
         self.level = level
         self.max_hp = base_hp + 6*level
         self.hp = self.max_hp
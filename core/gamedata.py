@@ -1,5 +1,7 @@
-import json, os
-from data.inventory import EQUIP_SLOTS, ITEMS, ItemDef
+import json, os, threading, queue, atexit
+from data.inventory import EQUIP_SLOTS, ITEMS, ItemDef, DYNAMIC_ITEMS
+from core import savefmt
+from settings import SAVE_FORMAT
 
 SAVE_FILE = "ff_save.json"  # legacy
 SAVE_SLOTS = {
@@ -8,8 +10,98 @@ SAVE_SLOTS = {
     3: "ff_save_slot3.json",
 }
 
-def _slot_path(slot: int) -> str:
-    return SAVE_SLOTS.get(slot, SAVE_SLOTS[1])
+SAVE_VERSION = 5
+SAVE_FORMATS = ("json", "binary")   # binary = core.savefmt (.sav)
+DEFAULT_SAVE_FORMAT = SAVE_FORMAT  # new slots; existing ones keep their on-disk format
+_slot_formats: dict = {}            # slot -> format chosen via set_slot_format() (--save-format)
+
+def _slot_path(slot: int, fmt: str = "json") -> str:
+    path = SAVE_SLOTS.get(slot, SAVE_SLOTS[1])
+    return path if fmt == "json" else os.path.splitext(path)[0] + ".sav"
+
+def _existing_slot_path(slot: int):
+    """Whichever format the slot currently has on disk (newest wins), or None."""
+    found = [p for p in (_slot_path(slot, f) for f in SAVE_FORMATS) if os.path.exists(p)]
+    return max(found, key=os.path.getmtime) if found else None
+
+def slot_format(slot: int) -> str:
+    """Format the next save of this slot uses: explicit choice, else whatever is on disk."""
+    if slot in _slot_formats:
+        return _slot_formats[slot]
+    path = _existing_slot_path(slot)
+    return "binary" if path and path.endswith(".sav") else DEFAULT_SAVE_FORMAT
+
+def set_slot_format(slot: int, fmt: str):
+    """Select a slot's format; an existing save is converted (and migrated) right away."""
+    if fmt not in SAVE_FORMATS:
+        raise ValueError(f"unknown save format {fmt!r}")
+    SAVER.flush()
+    _slot_formats[slot] = fmt
+    path = _existing_slot_path(slot)
+    if path and path != _slot_path(slot, fmt):
+        write_save(read_save(path), slot)
+
+def migrate_save(data: dict) -> dict:
+    """Upgrade an older save dict (any format) to SAVE_VERSION in place."""
+    v = int(data.get("version", 1))
+    if v > SAVE_VERSION:
+        raise ValueError(f"save version {v} is newer than this build ({SAVE_VERSION})")
+    if v < 5:
+        # fields added up to v5; load_game tolerates them missing, but keep the dict complete
+        data.setdefault("hero_class", "FIGHTER")
+        data.setdefault("hero_name", "Hero")
+        data.setdefault("base_agility", 12)
+        data.setdefault("talent_points", 0)
+        data.setdefault("spell_mastery", {})
+        data.setdefault("quests", {})
+        data.setdefault("dynamic_items", [])
+        data.setdefault("companions", [])
+    data["version"] = SAVE_VERSION
+    return data
+
+def read_save(path: str) -> dict:
+    """Parse a slot file of either format (sniffed by magic header) and migrate it."""
+    with open(path, "rb") as f: raw = f.read()
+    if raw[:len(savefmt.MAGIC)] == savefmt.MAGIC:
+        data = savefmt.loads(raw)
+    else:
+        data = json.loads(raw)
+    return migrate_save(data)
+
+def _meta_path(path: str) -> str:
+    """Sidecar index next to a save: ff_save_slot1.json / .sav -> ff_save_slot1.meta.json"""
+    return os.path.splitext(path)[0] + ".meta.json"
+
+def _meta_from_save(d: dict) -> dict:
+    return {"name": d.get("hero_name","Hero"), "level": d.get("level",1), "class": d.get("hero_class","FIGHTER")}
+
+def _remove_quietly(path: str):
+    """Best-effort delete (a half-written temp file after a failed write)."""
+    try: os.remove(path)
+    except OSError: pass
+
+def _write_meta(path: str, meta: dict):
+    """Record slot summary + the save file's mtime/size it describes (validated on read)."""
+    st = os.stat(path)
+    rec = dict(meta, save_mtime_ns=st.st_mtime_ns, save_size=st.st_size)
+    mpath = _meta_path(path)
+    try:
+        with open(mpath + ".tmp", "w") as f: json.dump(rec, f)
+        os.replace(mpath + ".tmp", mpath)
+    except BaseException:
+        _remove_quietly(mpath + ".tmp")
+        raise
+
+def _read_meta(path: str):
+    """Sidecar summary if it still matches the save file, else None."""
+    try:
+        with open(_meta_path(path), "r") as f: rec = json.load(f)
+        st = os.stat(path)
+        if rec.get("save_mtime_ns") != st.st_mtime_ns or rec.get("save_size") != st.st_size:
+            return None
+        return {"name": rec["name"], "level": rec["level"], "class": rec["class"]}
+    except (OSError, ValueError, KeyError):
+        return None
 
 def _collect_dynamic_items(hero):
     """Snapshot stat-modified (affixed) item defs so they survive reload."""
@@ -44,14 +136,23 @@ def _rebuild_dynamic_items(dynamic_list):
         iid = d["id"]
         if iid in ITEMS:  # already present
             continue
-        ITEMS[iid] = ItemDef(
+        DYNAMIC_ITEMS.register(ItemDef(
             d["id"], d.get("name", iid), d.get("kind", "equipment"),
             price=d.get("price", 10), desc=d.get("desc",""),
             slot=d.get("slot"), stats=d.get("stats", {}), unlock_spell=d.get("unlock_spell"),
             quality=d.get("quality","COMMON"), dynamic=True
-        )
+        ))
 
-def save_game(hero, slot: int = 1):
+def _detach(obj):
+    """Copy nested dicts/lists so the snapshot can't change under the writer thread."""
+    if isinstance(obj, dict):
+        return {k: _detach(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_detach(v) for v in obj]
+    return obj
+
+def snapshot_save(hero) -> dict:
+    """Build the save dict (main thread only; touches live game objects)."""
     companions = []
     if hasattr(hero, "party"):
         for m in hero.party[1:]:
@@ -76,15 +177,93 @@ def save_game(hero, slot: int = 1):
         "base_agility": getattr(hero, "base_agility", 12),
         "hero_name": getattr(hero, "name", "Hero"),
         "companions": companions,          # NEW
-        "version": 5
+        "version": SAVE_VERSION
     }
-    with open(_slot_path(slot), "w") as f: json.dump(data, f)
+    return _detach(data)
+
+def write_save(data: dict, slot: int = 1):
+    """Serialize (in the slot's format) to a temp file, fsync, then atomically replace the slot file."""
+    fmt = slot_format(slot)
+    path = _slot_path(slot, fmt)
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            if fmt == "binary":
+                f.write(savefmt.dumps(data, data.get("version", SAVE_VERSION)))
+            else:
+                f.write(json.dumps(data).encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        _remove_quietly(tmp)  # the slot file itself is untouched
+        raise
+    for other in SAVE_FORMATS:  # drop the slot's copy in the other format
+        stale = _slot_path(slot, other)
+        if stale != path and os.path.exists(stale):
+            _remove_quietly(stale)
+    try:
+        _write_meta(path, _meta_from_save(data))
+    except OSError:
+        pass  # list_saves falls back to parsing the save
     return f"Saved slot {slot}."
 
+def save_game(hero, slot: int = 1):
+    """Synchronous (but atomic) save."""
+    SAVER.flush()  # keep ordering with any queued background save
+    return write_save(snapshot_save(hero), slot)
+
+class SaveWorker:
+    """
+    Background save writer. submit() snapshots on the caller's (main) thread and queues
+    the write; poll() runs completion callbacks back on the main thread.
+    """
+    def __init__(self):
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._done: "queue.Queue" = queue.Queue()
+        self._thread: threading.Thread | None = None
+        atexit.register(self.flush)  # once per worker, not per thread (re)start
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name="SaveWorker", daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            data, slot, on_done = self._jobs.get()
+            try:
+                msg = write_save(data, slot)
+            except Exception as e:
+                msg = f"Save failed: {e}"
+            self._done.put((on_done, msg))
+            self._jobs.task_done()
+
+    def submit(self, hero, slot: int = 1, on_done=None):
+        self._ensure_thread()
+        self._jobs.put((snapshot_save(hero), slot, on_done))
+
+    def poll(self):
+        """Deliver finished-save messages (call once per frame)."""
+        while True:
+            try:
+                on_done, msg = self._done.get_nowait()
+            except queue.Empty:
+                return
+            if on_done: on_done(msg)
+
+    def flush(self):
+        """Block until queued saves are on disk."""
+        if self._thread is not None and self._thread.is_alive():
+            self._jobs.join()
+
+SAVER = SaveWorker()
+
 def load_game(hero, slot: int = 1):
-    path = _slot_path(slot)
-    if not os.path.exists(path): return "No save file."
-    with open(path,"r") as f: data=json.load(f)
+    SAVER.flush()  # never read a slot with a write still queued
+    path = _existing_slot_path(slot)
+    if path is None: return "No save file."
+    data = read_save(path)
     _rebuild_dynamic_items(data.get("dynamic_items", []))
 
     # --- APPLY CLASS FIRST (so later gating uses correct class) ---
@@ -144,17 +323,23 @@ def load_game(hero, slot: int = 1):
     return f"Loaded slot {slot}."
 
 def list_saves():
-    """Return list of (slot, present, meta_dict_or_None)."""
+    """Return list of (slot, present, meta_dict_or_None); reads sidecar indexes when fresh."""
     out = []
-    for slot, path in SAVE_SLOTS.items():
-        if os.path.exists(path):
+    for slot in SAVE_SLOTS:
+        path = _existing_slot_path(slot)
+        if path is not None:
+            meta = _read_meta(path)
+            if meta is not None:
+                out.append((slot, True, meta))
+                continue
+            # Stale / missing index: full parse, then rebuild the sidecar
             try:
-                with open(path,"r") as f: d=json.load(f)
-                out.append((slot, True, {
-                    "name": d.get("hero_name","Hero"),
-                    "level": d.get("level",1),
-                    "class": d.get("hero_class","FIGHTER")
-                }))
+                meta = _meta_from_save(read_save(path))
+                try:
+                    _write_meta(path, meta)
+                except OSError:
+                    pass
+                out.append((slot, True, meta))
             except Exception:
                 out.append((slot, True, None))
         else:
@@ -1,17 +1,29 @@
-import pygame, sys, time
+import pygame, sys
 from data.inventory import use_item
 from core.gamedata import load_game
+from core.session import now as session_now, mouse_pos, set_mouse_pos
 
 class InputController:
-    def __init__(self, game):
+    def __init__(self, game, source=None):
         self.g = game  # reference to Game
+        # Event/key-state source: pygame by default, or e.g. core.soak.ScriptedInput
+        self.source = source
+
+    def pressed(self):
+        """Held-key state (indexable by pygame key codes)."""
+        return self.source.pressed() if self.source else pygame.key.get_pressed()
 
     # ---- public entry ----
     def process_events(self):
-        for event in pygame.event.get():
+        for event in (self.source.events() if self.source else pygame.event.get()):
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit(0)
+            pos = getattr(event, "pos", None)
+            if pos is not None: set_mouse_pos(pos)
             if event.type == pygame.KEYDOWN:
+                if event.key in (pygame.K_F3, pygame.K_F4):  # profiler (any state)
+                    self._profiler_key(event.key)
+                    continue
                 if self.g.state == "START":
                     self.g.start_screen.handle_key(event.key, getattr(event, "unicode", ""), event.mod)  # CHANGED
                     continue
@@ -30,17 +42,25 @@ class InputController:
                 continue
 
             # UI mouse routing (shop > inventory > world)
-            if self.g.shop.opened:
+            if self.g.shop_open:
                 self.g.shop.handle_event(event)
                 self.g.inv_ui.handle_event(event)
             elif self.g.inv_open:
                 self.g.inv_ui.handle_event(event)
             else:
                 if event.type == pygame.MOUSEBUTTONDOWN and event.button in (1, 3):
-                    self.g._pickup_ground_at(pygame.mouse.get_pos())
+                    self.g._pickup_ground_at(mouse_pos())
                 if event.type == pygame.KEYDOWN and event.key == pygame.K_g:
                     self.g._pickup_nearest_ground()
 
+    def _profiler_key(self, key):
+        g = self.g
+        if key == pygame.K_F3:
+            g.profiler.toggle()
+        else:
+            msg = g.profiler.toggle_csv()
+            if hasattr(g.overworld, "set_toast"): g.overworld.set_toast(msg)
+
     # ---- key handling ----
     def _handle_keydown(self, key):
         g = self.g
@@ -78,7 +98,7 @@ class InputController:
             g.talent_open = False; g.overworld.movement_locked = False; g.exit_confirm_until = 0.0; return
         if g.help_open:
             g.help_open = False; g.exit_confirm_until = 0.0; return
-        if g.shop.opened:
+        if g.shop_open:
             g.shop.close(); g.exit_confirm_until = 0.0; return
         if g.inv_open:
             g.inv_open = False; g.exit_confirm_until = 0.0; return
@@ -86,7 +106,7 @@ class InputController:
             g.char_open = False; g.exit_confirm_until = 0.0; return
         if g.journal_open:
             g.journal_open = False; g.exit_confirm_until = 0.0; return
-        now = time.time()
+        now = session_now()
         if now < g.exit_confirm_until:
             pygame.quit(); sys.exit(0)
         g.exit_confirm_until = now + 3.0
@@ -125,7 +145,7 @@ class InputController:
 
         if key == pygame.K_i:
             # Force merge inventories before opening shared pool UI.
-            if g.shop.opened: g.shop.close()
+            if g.shop_open: g.shop.close()
             # NEW: unify party inventory into leader before showing UI
             g.unify_party_inventory()
             g.inv_open = not g.inv_open
@@ -134,12 +154,12 @@ class InputController:
                 g.inv_ui.refresh_party_layout()   # NEW: ensure paper dolls reflect party
             return
         if key == pygame.K_c:
-            if g.shop.opened: g.shop.close()
+            if g.shop_open: g.shop.close()
             g.char_open = not g.char_open
             if g.char_open: g.inv_open = False
             return
         if key == pygame.K_j:
-            if g.shop.opened: g.shop.close()
+            if g.shop_open: g.shop.close()
             g.journal_open = not g.journal_open
             return
         if key == pygame.K_l:
@@ -166,7 +186,7 @@ class InputController:
                 g.inv_open = False
                 g.char_open = False
                 g.journal_open = False
-                if g.shop.opened: g.shop.close()
+                if g.shop_open: g.shop.close()
             return
         if key == pygame.K_t:
             if getattr(g, "talent_open", False):
@@ -179,7 +199,7 @@ class InputController:
                 g.inv_open = False
                 g.char_open = False
                 g.journal_open = False
-                if g.shop.opened: g.shop.close()
+                if g.shop_open: g.shop.close()
             return
         if key == pygame.K_y:
             if g.overworld.near_tavern():
@@ -192,7 +212,7 @@ class InputController:
             if g.party_open:
                 g.overworld.movement_locked = True
                 g.help_open = g.inv_open = g.char_open = g.journal_open = g.talent_open = False
-                if g.shop.opened: g.shop.close()
+                if g.shop_open: g.shop.close()
                 g.tavern_open = False
                 g.party_ui.sync_from_party()
             else:
@@ -224,19 +244,7 @@ class InputController:
             if key == pygame.K_RETURN:
                 if (not b.ran_away) and not b.victory_loot_done:
                     # XP share: all living party members
-                    xp_gain = b.total_xp_yield
-                    if xp_gain > 0:
-                        living = [m for m in [self.g.hero] + b.companions if m.is_alive()]
-                        share = max(1, xp_gain // max(1, len(living)))
-                        for m in living:
-                            msgs = m.add_xp(share)
-                            if m is self.g.hero:
-                                b.log.append(f"{m.name} +{share} XP")
-                                b.log.extend(msgs)
-                            else:
-                                b.log.append(f"{m.name} +{share} XP")
-                        q_msgs = self.g.hero.quest.turn_in_completed(self.g.hero)
-                        for m in q_msgs: b.log.append(m)
+                    b.log.extend(b.award_xp())
                 self.g.battle = None
             return
 
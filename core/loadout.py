@@ -0,0 +1,174 @@
+"""
+Loadout optimizer: best assignment of owned gear (shared inventory + everything the party
+has equipped) to every member's EQUIP_SLOTS, the thief's shield slot doubling as an
+off-hand, for a weighted stat objective.
+
+Each item scores w . ItemDef.vec for a member, so the objective is a sum of per-position
+scores and the search is a small branch and bound:
+  * dominance: a member only needs the top K items per slot kind, K being how many party
+    positions accept that kind; any worse item is beaten by K others, and the other K-1
+    positions cannot use them all up, so swapping one in never loses (exact);
+  * bound: positions are filled best-first and a branch is cut once its score plus the
+    best remaining candidate per open position cannot beat the best complete loadout.
+
+    python bench/bench.py loadout [items] [check]   # time it on N random affixed items
+"""
+import time
+from operator import mul
+from data.inventory import ITEMS, EQUIP_SLOTS, STAT_INDEX, N_STATS, STAT_KEYS
+
+# Stat weights per class ("res" covers every res_* column); a member's score is the
+# weighted sum of its gear stats. Base stats are the same under any loadout, so only gear counts.
+CLASS_WEIGHTS = {
+    "FIGHTER":    {"attack": 3.0, "defense": 2.0, "hp": 0.25, "agility": 1.0, "res": 0.1},
+    "THIEF":      {"attack": 2.5, "defense": 1.5, "hp": 0.2, "agility": 2.0, "res": 0.1},
+    "BLACK_MAGE": {"magic": 3.0, "defense": 1.5, "mp": 0.25, "hp": 0.2, "agility": 0.5, "res": 0.1},
+    "WHITE_MAGE": {"magic": 2.5, "defense": 2.0, "mp": 0.3, "hp": 0.25, "agility": 0.5, "res": 0.15},
+}
+DEFAULT_WEIGHTS = CLASS_WEIGHTS["FIGHTER"]
+
+def weight_vector(weights) -> tuple:
+    """{stat: weight} (plus the "res" shorthand) -> weights in STAT_KEYS order."""
+    w = [0.0] * N_STATS
+    for k, v in weights.items():
+        if k == "res":
+            for i, key in enumerate(STAT_KEYS):
+                if key.startswith("res_"): w[i] = v
+        elif k in STAT_INDEX:
+            w[STAT_INDEX[k]] = v
+        else:
+            raise ValueError(f"unknown stat {k!r}")
+    return tuple(w)
+
+def slot_accepts(member, slot) -> tuple:
+    """Item slot kinds a member's equipment slot takes (thief shield slot: off-hand weapon too)."""
+    if slot == "shield" and member.hero_class == "THIEF":
+        return ("shield", "weapon")
+    return (slot,)
+
+class Loadout:
+    """Optimizer result: per-member {slot: item_id} plus score and search stats."""
+    def __init__(self, equipment, scores, nodes, candidates, pool_items, ms):
+        self.equipment = equipment      # [ {slot: item_id or None} ] in party order
+        self.scores = scores            # per-member objective
+        self.score = sum(scores)
+        self.nodes = nodes              # search nodes visited
+        self.candidates = candidates    # item options left after dominance pruning
+        self.pool_items = pool_items    # distinct equipment ids considered
+        self.ms = ms
+
+    def changes(self, party):
+        """[(member_index, slot, old_id, new_id)] needed to reach this loadout."""
+        return [(i, s, m.equipment.get(s), eq[s]) for i, (m, eq) in enumerate(zip(party, self.equipment))
+                for s in EQUIP_SLOTS if m.equipment.get(s) != eq[s]]
+
+    def placement(self, item_id):
+        """(member_index, slot) holding item_id in this loadout, or None."""
+        return next(((i, s) for i, eq in enumerate(self.equipment) for s in EQUIP_SLOTS
+                     if eq[s] == item_id), None)
+
+def optimize(party, counts, weights=None, prune=True) -> Loadout:
+    """
+    Best gear for `party` from `counts` (bag item_id -> qty) plus what the party wears.
+    weights: {stat: w} for everyone, or a callable member -> {stat: w} (default CLASS_WEIGHTS).
+    prune=False searches every option (slow; for checking the pruned result).
+    """
+    t0 = time.perf_counter()
+    party = list(party)
+    pool = {}
+    for iid, q in counts.items():
+        d = ITEMS.get(iid)
+        if d is not None and d.kind == "equipment" and d.slot and q > 0: pool[iid] = q
+    for m in party:
+        for iid in m.equipment.values():
+            if iid: pool[iid] = pool.get(iid, 0) + 1
+
+    # positions (member, slot) and how many accept each slot kind
+    positions = [(mi, s, slot_accepts(m, s)) for mi, m in enumerate(party) for s in EQUIP_SLOTS]
+    demand = {}
+    for _, _, kinds in positions:
+        for k in kinds: demand[k] = demand.get(k, 0) + 1
+    by_kind = {}
+    for iid in pool: by_kind.setdefault(ITEMS[iid].slot, []).append(iid)
+
+    # per member and slot kind: candidates by score, best first, cut to the top `demand` copies
+    opts = {}
+    for mi, m in enumerate(party):
+        w = weights(m) if callable(weights) else (weights or CLASS_WEIGHTS.get(m.hero_class, DEFAULT_WEIGHTS))
+        wv = weight_vector(w)
+        vec_score = {}
+        for kind, ids in by_kind.items():
+            scored = []
+            for iid in ids:
+                vec = ITEMS[iid].vec
+                sc = vec_score.get(vec)
+                if sc is None: sc = vec_score[vec] = sum(map(mul, wv, vec))
+                if sc > 0 or (sc == 0 and iid in m.equipment.values()):  # keep a neutral item already worn
+                    scored.append((sc, iid in m.equipment.values(), iid))
+            scored.sort(reverse=True)
+            if prune:
+                need, keep = demand.get(kind, 0), []
+                for entry in scored:
+                    if need <= 0: break
+                    keep.append(entry); need -= pool[entry[2]]
+                scored = keep
+            opts[mi, kind] = [(sc, iid) for sc, _, iid in scored]
+
+    # Slot kinds only interact through positions accepting several of them (the thief
+    # off-hand ties weapons to shields), so each connected group is searched on its own.
+    group = {}  # slot kind -> representative kind of its group
+    def find(k):
+        while group.setdefault(k, k) != k: k = group[k]
+        return k
+    for _, _, kinds in positions:
+        for k in kinds[1:]: group[find(k)] = find(kinds[0])
+    picks, nodes, n_opts = {}, 0, 0
+    for root in {find(k) for k in demand}:
+        # (score, worn here, id) best first: on equal scores the item already in the slot wins,
+        # so an equivalent swap is never proposed
+        cand = [(mi, s, sorted(((sc, party[mi].equipment.get(s) == iid, iid)
+                                for k in kinds for sc, iid in opts.get((mi, k), ())), reverse=True))
+                for mi, s, kinds in positions if find(kinds[0]) == root]
+        n_opts += sum(len(c[2]) for c in cand)
+        best, visited = _search(cand, pool, prune)
+        picks.update(best); nodes += visited
+    equipment = [{s: None for s in EQUIP_SLOTS} for _ in party]
+    scores = [0.0] * len(party)
+    for (mi, s), p in picks.items():
+        if p: equipment[mi][s] = p[0]; scores[mi] += p[1]
+    for m, eq in zip(party, equipment):  # off-hand weapon needs a main weapon: move it over
+        if m.hero_class == "THIEF" and not eq["weapon"] and eq["shield"] and ITEMS[eq["shield"]].slot == "weapon":
+            eq["weapon"], eq["shield"] = eq["shield"], None
+    return Loadout(equipment, scores, nodes, n_opts, len(pool),
+                   (time.perf_counter() - t0) * 1e3)
+
+def _search(cand, pool, prune=True):
+    """Branch and bound over positions [(member, slot, [(score, worn, item_id)] best first)]."""
+    cand = sorted(cand, key=lambda c: -(c[2][0][0] if c[2] else 0.0))  # most valuable first
+    n = len(cand)
+    bound = [0.0] * (n + 1)  # best possible score of positions i.. ignoring conflicts
+    for i in range(n - 1, -1, -1):
+        bound[i] = bound[i + 1] + (cand[i][2][0][0] if cand[i][2] else 0.0)
+    left = dict(pool)
+    pick = [None] * n
+    best = [-1.0, None]
+    nodes = 0
+
+    def search(i, score):
+        nonlocal nodes
+        nodes += 1
+        if i == n:
+            if score > best[0]: best[0] = score; best[1] = list(pick)
+            return
+        if prune and score + bound[i] <= best[0]: return
+        for sc, _, iid in cand[i][2]:
+            if left[iid]:
+                left[iid] -= 1; pick[i] = (iid, sc)
+                search(i + 1, score + sc)
+                left[iid] += 1
+                if prune and score + bound[i] <= best[0]: return
+        pick[i] = None
+        search(i + 1, score)
+
+    search(0, 0.0)
+    return dict(zip(((mi, s) for mi, s, _ in cand), best[1])), nodes
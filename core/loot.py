@@ -27,7 +27,7 @@ GOLD_ROLL = {
     "GOLEM":  (24, 55),
 }
 
-def roll_loot(enemies):
+def roll_loot(enemies, rng=random):
     # Equipment rolls may produce affixed variants via generate_affixed_equipment.
     items = {}
     gold = 0
@@ -35,15 +35,15 @@ def roll_loot(enemies):
         species = getattr(e, "species", "GOBLIN")
         # consumables
         for item_id, chance, (lo, hi) in LOOT_TABLES.get(species, []):
-            if random.random() < chance:
-                qty = random.randint(lo, hi)
+            if rng.random() < chance:
+                qty = rng.randint(lo, hi)
                 items[item_id] = items.get(item_id, 0) + qty
         # equipment (each independent roll)
         for item_id, chance in EQUIP_DROPS.get(species, []):
-            if random.random() < chance:
-                affixed_id = generate_affixed_equipment(item_id)
+            if rng.random() < chance:
+                affixed_id = generate_affixed_equipment(item_id, rng)
                 items[affixed_id] = items.get(affixed_id, 0) + 1
         # gold
         g_lo, g_hi = GOLD_ROLL.get(species, (5, 15))
-        gold += random.randint(g_lo, g_hi)
+        gold += rng.randint(g_lo, g_hi)
     return items, gold
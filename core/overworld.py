@@ -1,6 +1,7 @@
-import pygame, random
+import pygame
 from settings import *
 from core.battle import Battle
+from core.session import RNG
 
 class Overworld:
     """
@@ -84,14 +85,16 @@ class Overworld:
 
         if self._moving and in_grass:
             # ~2–3% per poll; tuned to feel like classic JRPG step chance
-            if random.random() < 0.025:
+            if RNG.random() < 0.025:
                 self._encounter_cooldown = 1.5
                 # Encounter level near hero level
-                enc_lvl = max(1, self.hero.level() + random.choice([-1, 0, 0, 1]))
+                enc_lvl = max(1, self.hero.level() + RNG.choice([-1, 0, 0, 1]))
                 return Battle(self.hero, enc_lvl)
         return None
 
-    def draw(self, surf):
+    # ----- Drawing -----
+    def draw_static(self, surf):
+        """Zones and labels; never change, so they can be baked once."""
         surf.fill((10, 12, 14))
 
         # Simple world tiles
@@ -112,17 +115,32 @@ class Overworld:
         draw_text(surf, "TAVERN", self.tavern_rect.x + 10, self.tavern_rect.y + 8, CYAN, FONT_BIG)
         draw_text(surf, "Press [Y] to hire", self.tavern_rect.x + 10, self.tavern_rect.y + 34, WHITE, FONT)
 
+    def background(self, size) -> pygame.Surface:
+        """Static layers baked into a cached surface of the given size."""
+        bg = getattr(self, "_background", None)
+        if bg is None or bg.get_size() != tuple(size):
+            bg = pygame.Surface(size).convert() if pygame.display.get_surface() else pygame.Surface(size)
+            self.draw_static(bg)
+            self._background = bg
+        return bg
+
+    def toast_rect(self):
+        if not self.toast: return None
+        pad = 10
+        msg_w = FONT_BIG.size(self.toast)[0] + pad * 2
+        return pygame.Rect(PANEL_MARGIN, SCREEN_H - LOG_HEIGHT - 18 - 40, msg_w, 36)
+
+    def draw_toast(self, surf):
+        r = self.toast_rect()
+        if r is None: return
+        pygame.draw.rect(surf, (20, 20, 26), r, border_radius=8)
+        draw_text(surf, self.toast, r.x + 10, r.y + 8, WHITE, FONT_BIG)
+
+    def draw(self, surf):
+        surf.blit(self.background(surf.get_size()), (0, 0))
+
         # Hero
         self.hero.draw(surf)
 
         # HUD / Toast
-        if self.toast:
-            pad = 10
-            msg_w = FONT_BIG.size(self.toast)[0] + pad * 2
-            x = PANEL_MARGIN
-            y = SCREEN_H - LOG_HEIGHT - 18 - 40
-            pygame.draw.rect(surf, (20, 20, 26), (x, y, msg_w, 36), border_radius=8)
-            draw_text(surf, self.toast, x + pad, y + 8, WHITE, FONT_BIG)
-            y = SCREEN_H - LOG_HEIGHT - 18 - 40
-            pygame.draw.rect(surf, (20, 20, 26), (x, y, msg_w, 36), border_radius=8)
-            draw_text(surf, self.toast, x + pad, y + 8, WHITE, FONT_BIG)
+        self.draw_toast(surf)
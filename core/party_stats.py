@@ -0,0 +1,82 @@
+"""
+Party stat engine: base + gear totals, resistances and the hover-compare delta of a
+candidate item for every party member (STAT_KEYS columns), built in one pass from each
+member's cached gear vector. The stat sheet and battle panel read one StatSheet, rebuilt
+only when someone's gear or base stats (or the candidate) change.
+"""
+from operator import attrgetter
+from data.inventory import ITEMS, EQUIP_SLOTS, STAT_INDEX, N_STATS
+
+BASE_ATTRS = ("base_attack", "base_magic", "base_defense", "base_hp", "base_mp", "base_agility")  # STAT_KEYS[:6]
+_bases = attrgetter(*BASE_ATTRS)
+_ZERO = (0,) * N_STATS
+_SLOT = {s: i for i, s in enumerate(EQUIP_SLOTS)}
+
+def equip_target_slot(member, idef):
+    """Slot an equipment def goes to for this member (thief: second weapon -> offhand)."""
+    slot = idef.slot
+    if slot == "weapon" and member.hero_class == "THIEF" and member.equipment.get("weapon"):
+        off = member.equipment.get("shield")
+        if off is None or ITEMS[off].slot != "weapon":
+            return "shield"
+    return slot
+
+class StatSheet:
+    """One pass's result: base / gear / totals (and delta for the candidate) per member."""
+    __slots__ = ("members", "base", "gear", "totals", "candidate", "slots", "delta")
+
+    def __init__(self, members, base, gear, totals, candidate=None, slots=None, delta=None):
+        self.members = members; self.base = base; self.gear = gear; self.totals = totals
+        self.candidate = candidate; self.slots = slots; self.delta = delta
+
+    def index(self, member) -> int:
+        return next(i for i, m in enumerate(self.members) if m is member)
+
+    def total(self, i, stat) -> int: return self.totals[i][stat]
+    def gear_bonus(self, i, stat) -> int: return self.gear[i][stat]
+    def base_value(self, i, stat) -> int: return self.base[i][stat]
+
+    def resist(self, i, elem) -> int:
+        s = STAT_INDEX.get(f"res_{elem.upper()}")
+        return 0 if s is None else self.totals[i][s]
+
+    def change(self, i, stat) -> int:
+        """Stat change if member i equipped the candidate (0 when none / it doesn't fit)."""
+        return 0 if self.delta is None else self.delta[i][stat]
+
+class PartyStats:
+    """
+    Builds StatSheets, cached on (member, gear_rev, base stats) plus the candidate, so steady
+    frames reuse the last sheet. Members keep their own gear_totals; this is the party view.
+    """
+    def __init__(self):
+        self._key = None
+        self._sheet = None
+        self.builds = 0
+
+    def sheet(self, party, candidate=None) -> StatSheet:
+        members = tuple(party)
+        key = (candidate, *[(id(m), m.gear_rev, _bases(m)) for m in members])
+        if key != self._key:
+            self._sheet = self.build(members, candidate)
+            self._key = key
+        return self._sheet
+
+    def build(self, members, candidate=None) -> StatSheet:
+        self.builds += 1
+        gear = [m.gear_totals() for m in members]   # each member's cached equipment sum
+        bases = [_bases(m) + _ZERO[len(BASE_ATTRS):] for m in members]
+        totals = [list(map(int.__add__, b, g)) for b, g in zip(bases, gear)]
+        cdef = ITEMS.get(candidate) if candidate else None
+        if cdef is not None and cdef.kind != "equipment": cdef = None
+        slots = delta = None
+        if cdef:  # candidate minus whatever it would replace
+            slots = [equip_target_slot(m, cdef) for m in members]
+            delta = []
+            for m, s in zip(members, slots):
+                cur = m.equipment.get(s) if s in _SLOT else None
+                delta.append(list(map(int.__sub__, cdef.vec, ITEMS[cur].vec)) if cur
+                             else list(cdef.vec) if s in _SLOT else list(_ZERO))
+        return StatSheet(members, bases, gear, totals, cdef and cdef.id, slots, delta)
+
+PARTY_STATS = PartyStats()
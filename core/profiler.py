@@ -0,0 +1,173 @@
+import atexit, csv, os, sys, time
+from collections import deque
+import pygame
+from settings import FONT, WHITE, GOLD, SILVER, draw_text
+
+class _Section:
+    __slots__ = ("prof", "name", "t0")
+    def __init__(self, prof, name):
+        self.prof = prof; self.name = name
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+    def __exit__(self, *exc):
+        self.prof.add(self.name, time.perf_counter() - self.t0)
+
+class _NoSection:
+    __slots__ = ()
+    def __enter__(self): pass
+    def __exit__(self, *exc): pass
+
+_NO_SECTION = _NoSection()
+
+class FrameProfiler:
+    """
+    Per-frame timings by subsystem (input, updates, each overlay's draw, flip, sleep) with
+    rolling p50/p95/p99 over the last `window` frames. F3 toggles the overlay, F4 the CSV
+    dump (frame, section, ms rows). Set FF_PROFILE_CSV=<path> to record from startup.
+    Costs nothing beyond a flag check while neither is on. An open CSV is closed by
+    stop_csv(): Game.run calls it on the way out, and an atexit hook covers other exits.
+    """
+    def __init__(self, window=600, csv_path="frame_profile.csv"):
+        self.window = window
+        self.csv_path = csv_path
+        self.visible = False
+        self._hist: dict = {}          # section -> deque of seconds
+        self._cur: dict = {}
+        self._t0 = 0.0
+        self._csv_file = None
+        self._csv = None
+        self._frame_no = 0
+        self._atexit = False
+        env = os.environ.get("FF_PROFILE_CSV")
+        if env: self.start_csv(env)
+
+    @property
+    def enabled(self) -> bool:
+        return self.visible or self._csv is not None
+
+    def toggle(self):
+        self.visible = not self.visible
+        if not self.enabled: self._hist.clear()
+
+    # ----- recording -----
+    def section(self, name):
+        return _Section(self, name) if self.enabled else _NO_SECTION
+
+    def add(self, name, seconds):
+        self._cur[name] = self._cur.get(name, 0.0) + seconds
+
+    def begin_frame(self):
+        self._cur = {}
+        self._t0 = time.perf_counter()
+
+    def end_frame(self):
+        """Close the frame (call after the frame-rate sleep so 'frame' is the full period)."""
+        if not self.enabled: return
+        cur = self._cur
+        cur["frame"] = time.perf_counter() - self._t0
+        frames = len(self._hist["frame"]) if "frame" in self._hist else 0
+        for name in cur:
+            if name not in self._hist:  # new section: zero-fill so all windows stay aligned
+                self._hist[name] = deque([0.0] * frames, maxlen=self.window)
+        for name, h in self._hist.items():
+            h.append(cur.get(name, 0.0))
+        if self._csv is not None:
+            self._write_row(cur)
+        self._frame_no += 1
+
+    # ----- stats -----
+    def percentiles(self, name, qs=(50, 95, 99)):
+        """Milliseconds at each percentile over the window (frames without the section count as 0)."""
+        h = self._hist.get(name)
+        if not h: return tuple(0.0 for _ in qs)
+        vals = sorted(h)
+        n = len(vals)
+        return tuple(vals[min(n - 1, (q * n) // 100)] * 1e3 for q in qs)
+
+    def report(self):
+        """{section: (p50, p95, p99)} in ms, heaviest p95 first."""
+        rows = {name: self.percentiles(name) for name in self._hist}
+        return dict(sorted(rows.items(), key=lambda kv: -kv[1][1]))
+
+    # ----- CSV dump -----
+    def start_csv(self, path=None):
+        self.stop_csv()
+        self.csv_path = path or self.csv_path
+        self._csv_file = open(self.csv_path, "w", newline="")
+        self._csv = csv.writer(self._csv_file)
+        self._csv.writerow(["frame", "section", "ms"])
+        self._frame_no = 0
+        if not self._atexit:
+            atexit.register(self.stop_csv); self._atexit = True
+
+    def stop_csv(self):
+        if self._csv_file is not None:
+            self._csv_file.close()
+        self._csv_file = self._csv = None
+
+    def toggle_csv(self) -> str:
+        if self._csv is not None:
+            self.stop_csv()
+            return f"Profile CSV saved: {self.csv_path}"
+        self.start_csv()
+        return f"Recording frame profile -> {self.csv_path}"
+
+    def _write_row(self, cur):
+        # long format (frame, section, ms): sections can come and go between frames
+        n = self._frame_no
+        self._csv.writerows([(n, name, f"{v * 1e3:.3f}") for name, v in cur.items()])
+
+    # ----- overlay -----
+    def draw(self, surf):
+        if not self.visible or "frame" not in self._hist: return
+        rows = self.report()
+        lh = FONT.get_height() + 2
+        w, h = 360, 30 + lh * (len(rows) + 1)
+        rect = pygame.Rect(surf.get_width() - w - 12, 12, w, h)
+        panel = pygame.Surface(rect.size, pygame.SRCALPHA)
+        panel.fill((8, 8, 12, 210))
+        surf.blit(panel, rect)
+        p50 = self.percentiles("frame")[0]
+        draw_text(surf, f"Frame profile ({len(self._hist['frame'])} frames)  ~{1000 / max(p50, 1e-6):.0f} fps",
+                  rect.x + 10, rect.y + 6, GOLD, FONT)
+        y = rect.y + 8 + lh
+        draw_text(surf, f"{'section':<16}", rect.x + 10, y, SILVER, FONT)
+        for i, lbl in enumerate(("p50", "p95", "p99")):
+            draw_text(surf, lbl, rect.x + 170 + i * 62, y, SILVER, FONT)
+        for name, qs in rows.items():
+            y += lh
+            draw_text(surf, name, rect.x + 10, y, WHITE, FONT)
+            for i, v in enumerate(qs):
+                draw_text(surf, f"{v:6.2f}", rect.x + 170 + i * 62, y, WHITE, FONT)
+
+class StartupTimer:
+    """
+    Wall-clock marks from process start to the first frame (imports, pygame.init, display,
+    game state, first frame) plus later lazy work (overlay builds).
+    `verbose` prints the report at the first frame and each later mark as it happens.
+    """
+    def __init__(self, t0=None, verbose=False):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.verbose = verbose
+        self.marks: list = []     # (name, ms spent, ms since t0)
+        self._last = self.t0
+        self.done = False
+
+    def mark(self, name, since=None):
+        """Record a phase ending now; it started at `since` (default: the previous mark)."""
+        now = time.perf_counter()
+        start = self._last if since is None else since
+        self.marks.append((name, (now - start) * 1e3, (now - self.t0) * 1e3))
+        if since is None: self._last = now
+        if self.verbose and self.done:
+            print(f"[startup] {name}: {(now - start) * 1e3:.1f} ms", file=sys.stderr)
+
+    def finish(self, name="first frame"):
+        self.mark(name)
+        self.done = True
+        if self.verbose: print(self.report(), file=sys.stderr)
+
+    def report(self) -> str:
+        lines = [f"{'phase':<22} {'ms':>8} {'at ms':>8}"]
+        lines += [f"{name:<22} {ms:>8.1f} {at:>8.1f}" for name, ms, at in self.marks]
+        return "\n".join(lines)
@@ -0,0 +1,73 @@
+import pygame
+
+class DirtyRenderer:
+    """
+    Dirty-rect presenter for the plain overworld (no overlays open).
+    Static zones come from Overworld.background(); each frame only the regions of
+    dynamic elements (hero, toast, ground items, HUD) that changed are restored,
+    redrawn and pushed with display.update(rects). Idle frames draw nothing.
+    """
+    def __init__(self, game):
+        self.g = game  # reference to Game
+        self.enabled = True
+        self._prev: dict = {}      # element key -> rect drawn last frame
+        self._full = True
+        self.last_dirty_count = 0
+
+    def invalidate(self):
+        """Force a full repaint next frame (after battle, overlays, start screen)."""
+        self._full = True
+
+    def can_handle(self) -> bool:
+        g = self.g
+        if not self.enabled or g.battle or g.hero_dead or g.profiler.visible: return False
+        return not (g.inv_open or g.shop_open or g.char_open or g.journal_open or g.help_open
+                    or g.talent_open or g.tavern_open or g.party_open)
+
+    # ----- element list (z-order matches Game.draw) -----
+    def _elements(self):
+        g = self.g; ow = g.overworld; h = g.hero
+        out = []
+        hb = h.draw_bounds()
+        out.append((("hero", hb.x, hb.y, "POISON" in h.status_effects, h.color), hb,
+                    lambda s: h.draw(s)))
+        tr = ow.toast_rect()
+        if tr is not None:
+            out.append((("toast", ow.toast), tr, ow.draw_toast))
+        for gi in g.ground.items:
+            out.append((("ground", id(gi), gi.item_id, gi.count, gi.rect.x, gi.rect.y), gi.rect,
+                        lambda s, gi=gi: g.ground.draw_item(s, gi)))
+        lines = g._hud_lines()
+        out.append((("hud",) + lines + (g.hud_rect.w,), g.hud_rect.copy(),
+                    lambda s: g._draw_overworld_stats_hud()))
+        return out
+
+    def draw(self):
+        g = self.g; screen = g.screen
+        bg = g.overworld.background(screen.get_size())
+        elems = self._elements()
+        cur = {k: r for k, r, _ in elems}
+
+        if self._full:
+            screen.blit(bg, (0, 0))
+            for _, _, fn in elems: fn(screen)
+            with g.profiler.section("flip"): pygame.display.flip()
+            self._prev = cur; self._full = False
+            self.last_dirty_count = -1
+            return
+
+        dirty = [r for k, r in self._prev.items() if k not in cur]
+        dirty += [r for k, r in cur.items() if k not in self._prev]
+        self._prev = cur
+        self.last_dirty_count = len(dirty)
+        if not dirty:
+            return  # idle frame: nothing changed on screen
+
+        # Restore background and recomposite every element touching each region (clipped)
+        for d in dirty:
+            screen.set_clip(d)
+            screen.blit(bg, d, d)
+            for _, r, fn in elems:
+                if r.colliderect(d): fn(screen)
+        screen.set_clip(None)
+        with g.profiler.section("flip"): pygame.display.update(dirty)
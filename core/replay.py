@@ -0,0 +1,207 @@
+"""
+Deterministic session recording and headless replay.
+
+    python main.py --record session.ffrec [--seed 42]     # play normally, recording
+    python -m core.replay session.ffrec [--render]          # re-run at max speed, verify, time
+
+A recording (JSON lines) holds a header (seed, sim rate, the save slots as they were at
+start), then one line per frame: frozen wall time, sim steps run, held movement keys and
+the input events, plus a state digest every DIGEST_EVERY frames and at the end.
+Gameplay randomness comes from core.session.RNG (seeded from the header) and gameplay
+timers from core.session.now() (the recorded frame time), so the replay is exact.
+"""
+import argparse, base64, json, os, sys, tempfile, time, zlib
+import pygame
+from core import session
+
+FORMAT_VERSION = 1
+DIGEST_EVERY = 600
+# keys the game polls through InputController.pressed() rather than events
+HELD_KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN,
+             pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s, pygame.K_RETURN)
+RECORDED = {pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN,
+            pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION, pygame.MOUSEWHEEL}
+_ATTRS = ("key", "mod", "unicode", "scancode", "pos", "button", "rel", "buttons", "x", "y")
+
+def encode_event(e) -> list:
+    d = {}
+    for k in _ATTRS:
+        v = getattr(e, k, None)
+        if v is not None:
+            d[k] = list(v) if isinstance(v, tuple) else v
+    return [e.type, d]
+
+def decode_event(rec):
+    etype, d = rec
+    d = {k: tuple(v) if isinstance(v, list) else v for k, v in d.items()}
+    return pygame.event.Event(etype, d)
+
+def state_digest(g) -> int:
+    """crc32 of the gameplay-relevant state (party, inventory, position, battle, RNG)."""
+    h = g.hero
+    party = [(m.name, m.hero_class, m.level(), m.xp, m.hp, m.mp, sorted(m.equipment.items(), key=str))
+             for m in getattr(h, "party", [h])]
+    battle = None
+    if g.battle:
+        b = g.battle
+        battle = (b.turn, b.active_index, [(e.species, e.hp) for e in b.enemies])
+    state = (party, h.gil, round(h.x, 3), round(h.y, 3), sorted(h.inventory.counts.items()),
+             battle, len(g.ground), session.RNG.getstate()[1][:8])
+    return zlib.crc32(repr(state).encode())
+
+def _snapshot_saves() -> dict:
+    from core.gamedata import SAVE_SLOTS, SAVE_FORMATS, _slot_path
+    out = {}
+    for slot in SAVE_SLOTS:
+        for fmt in SAVE_FORMATS:
+            p = _slot_path(slot, fmt)
+            if os.path.exists(p):
+                with open(p, "rb") as f: out[p] = base64.b64encode(f.read()).decode()
+    return out
+
+class Recorder:
+    """
+    Input source for InputController that passes pygame input through while logging it.
+    Game.run calls end_frame() once per frame with the steps it simulated.
+    """
+    def __init__(self, path, seed):
+        self.f = open(path, "w")
+        self.frames = 0
+        self._events: list = []
+        self._held: list = []
+        t0 = time.time()
+        session.set_frame_time(t0)  # startup (shop day, timers) sees the same clock on replay
+        self._header = {"format": FORMAT_VERSION, "seed": seed, "t0": t0, "sim_hz": None,
+                        "saves": _snapshot_saves()}
+
+    def start(self, game):
+        self._header["sim_hz"] = round(1.0 / game.sim_dt)
+        self.f.write(json.dumps(self._header) + "\n")
+
+    def events(self):
+        evs = pygame.event.get()
+        out = []
+        for e in evs:
+            if e.type in RECORDED:
+                out.append(encode_event(e))
+                if e.type == pygame.QUIT: break
+        self._events = out
+        keys = pygame.key.get_pressed()
+        self._held = [k for k in HELD_KEYS if keys[k]]
+        return evs
+
+    def pressed(self):
+        return pygame.key.get_pressed()
+
+    def end_frame(self, game, t, steps):
+        rec = {"t": t, "n": steps}
+        if self._held: rec["h"] = self._held
+        if self._events: rec["e"] = self._events
+        self._events = []
+        self.frames += 1
+        if self.frames % DIGEST_EVERY == 0:
+            rec["d"] = state_digest(game)
+        self.f.write(json.dumps(rec, separators=(",", ":")) + "\n")
+
+    def close(self, game, t=None):
+        """Flush the (possibly partial) last frame and the final digest."""
+        if self.f.closed: return
+        if self._events:
+            self.end_frame(game, session.now() if t is None else t, 0)
+        self.f.write(json.dumps({"end": True, "frames": self.frames, "d": state_digest(game)}) + "\n")
+        self.f.close()
+
+class _Keys:
+    def __init__(self, held): self.held = held
+    def __getitem__(self, key): return key in self.held
+
+class ReplaySource:
+    """Input source fed one recorded frame at a time."""
+    def __init__(self):
+        self._events: list = []
+        self._keys = _Keys(frozenset())
+
+    def load(self, frame):
+        self._events = [decode_event(e) for e in frame.get("e", ()) if e[0] != pygame.QUIT]
+        self._keys = _Keys(frozenset(frame.get("h", ())))
+
+    def events(self):
+        out, self._events = self._events, []
+        return out
+
+    def pressed(self):
+        return self._keys
+
+def load_recording(path):
+    with open(path) as f:
+        header = json.loads(f.readline())
+        frames, end = [], None
+        for line in f:
+            rec = json.loads(line)
+            if rec.get("end"): end = rec
+            else: frames.append(rec)
+    return header, frames, end
+
+def replay(path, render=False, workdir=None, log=sys.stderr):
+    """Re-run a recording headlessly as fast as possible. Returns a timing/verification report."""
+    header, frames, end = load_recording(path)
+    if header.get("format") != FORMAT_VERSION:
+        raise ValueError(f"unsupported recording format {header.get('format')}")
+    os.chdir(workdir or tempfile.mkdtemp(prefix="ff_replay_"))
+    for p, blob in header.get("saves", {}).items():
+        with open(p, "wb") as f: f.write(base64.b64decode(blob))
+    from main import Game
+    from core.gamedata import SAVER
+    session.reseed(header["seed"])
+    session.set_frame_time(header["t0"])
+    src = ReplaySource()
+    g = Game(fps_cap=None, headless=True, render=render, input_source=src)
+    g.sim_dt = 1.0 / header["sim_hz"]
+    mismatches, slow = [], []
+    steps = 0; quit_early = False
+    t0 = time.perf_counter()
+    try:
+        for i, fr in enumerate(frames, 1):
+            f0 = time.perf_counter()
+            session.set_frame_time(fr["t"])
+            src.load(fr)
+            g.input.process_events()
+            for _ in range(fr["n"]):
+                g.step(g.sim_dt)
+            steps += fr["n"]
+            if render: g.draw()
+            slow.append((time.perf_counter() - f0, i))
+            if "d" in fr and state_digest(g) != fr["d"]:
+                mismatches.append(i)
+    except SystemExit:
+        quit_early = True  # recorded ESC-ESC quit
+    finally:
+        SAVER.flush()
+    elapsed = time.perf_counter() - t0
+    final_ok = end is None or state_digest(g) == end["d"]
+    slow.sort(reverse=True)
+    report = {"frames": len(frames), "steps": steps, "seconds": elapsed,
+              "steps_per_s": steps / max(elapsed, 1e-9), "sim_seconds": steps * g.sim_dt,
+              "digest_mismatch_frames": mismatches, "final_digest_ok": final_ok,
+              "quit_in_recording": quit_early, "slowest_frames_ms": [(n, round(t * 1e3, 2)) for t, n in slow[:5]]}
+    if log:
+        log.write(f"{report['frames']} frames / {steps} steps ({report['sim_seconds']:.1f}s sim) replayed in "
+                  f"{elapsed:.2f}s ({report['steps_per_s']:.0f} steps/s)\n")
+        log.write(f"digests: {'OK' if final_ok and not mismatches else 'DIVERGED at frames ' + str(mismatches)}"
+                  f"{'' if final_ok else ' (final state differs)'}\n")
+        log.write("slowest frames (frame, ms): " + ", ".join(f"{n}:{ms}" for n, ms in report["slowest_frames_ms"]) + "\n")
+    return report
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Replay a recorded session headlessly and time it.")
+    ap.add_argument("recording")
+    ap.add_argument("--render", action="store_true", help="also draw each frame (dummy display)")
+    ap.add_argument("--workdir", default=None, help="where the recorded saves are restored (default: temp dir)")
+    args = ap.parse_args(argv)
+    report = replay(os.path.abspath(args.recording), args.render, args.workdir)
+    sys.exit(0 if report["final_digest_ok"] and not report["digest_mismatch_frames"] else 1)
+
+if __name__ == "__main__":
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    main()
@@ -0,0 +1,112 @@
+"""
+Compact binary save codec (msgpack-style tagged values with an interned string table).
+
+Layout:
+    b"SFSV" | u8 codec version | u8 flags | u16 save schema version | payload
+    payload (zlib'd, flags & 1) = string table + value tree
+    string table = varint count, then (varint byte length, utf-8 bytes) per string
+Every str in the tree (item ids, dict keys, names) is written once in the table and
+referenced by index, so ids repeated across inventory/equipment/dynamic defs cost a varint.
+
+This trades speed for size: the codec is pure Python, so saving and loading are several
+times slower than the C json module (stress save, 2000 items: ~40 ms vs ~8 ms each way),
+while the file is ~15x smaller. Pick it per slot (python main.py --save-format binary)
+where disk size matters; JSON stays the default. Timings: python bench/bench.py savefmt
+"""
+import struct, zlib
+
+MAGIC = b"SFSV"
+CODEC_VERSION = 1
+FLAG_ZLIB = 1
+
+_NONE, _TRUE, _FALSE, _INT, _NEG, _FLOAT, _STR, _LIST, _DICT = range(9)
+_HEADER = struct.Struct("<4sBBH")
+_F64 = struct.Struct("<d")
+
+def _varint(buf: bytearray, n: int):
+    while n >= 0x80:
+        buf.append((n & 0x7F) | 0x80)
+        n >>= 7
+    buf.append(n)
+
+def dumps(data: dict, schema_version: int = 0) -> bytes:
+    strings: dict = {}
+    body = bytearray()
+    def enc(v):
+        if v is None: body.append(_NONE)
+        elif v is True: body.append(_TRUE)
+        elif v is False: body.append(_FALSE)
+        elif isinstance(v, int):
+            if v >= 0: body.append(_INT); _varint(body, v)
+            else: body.append(_NEG); _varint(body, -v)
+        elif isinstance(v, float):
+            body.append(_FLOAT); body.extend(_F64.pack(v))
+        elif isinstance(v, str):
+            idx = strings.get(v)
+            if idx is None:
+                idx = strings[v] = len(strings)
+            body.append(_STR); _varint(body, idx)
+        elif isinstance(v, dict):
+            body.append(_DICT); _varint(body, len(v))
+            for k, x in v.items():
+                enc(k); enc(x)
+        elif isinstance(v, (list, tuple)):
+            body.append(_LIST); _varint(body, len(v))
+            for x in v: enc(x)
+        else:
+            raise TypeError(f"cannot encode {type(v).__name__}")
+    enc(data)
+    payload = bytearray()
+    _varint(payload, len(strings))
+    for s in strings:  # dict preserves insertion (= index) order
+        b = s.encode("utf-8")
+        _varint(payload, len(b)); payload += b
+    payload += body
+    return _HEADER.pack(MAGIC, CODEC_VERSION, FLAG_ZLIB, schema_version) + zlib.compress(bytes(payload), 6)
+
+def schema_version(blob: bytes) -> int:
+    return _HEADER.unpack_from(blob)[3]
+
+def loads(blob: bytes) -> dict:
+    magic, codec, flags, _ = _HEADER.unpack_from(blob)
+    if magic != MAGIC:
+        raise ValueError("not a binary save")
+    if codec > CODEC_VERSION:
+        raise ValueError(f"binary save codec v{codec} is newer than supported v{CODEC_VERSION}")
+    buf = blob[_HEADER.size:]
+    if flags & FLAG_ZLIB:
+        buf = zlib.decompress(buf)
+    pos = 0
+    def varint():
+        nonlocal pos
+        shift = n = 0
+        while True:
+            b = buf[pos]; pos += 1
+            n |= (b & 0x7F) << shift
+            if b < 0x80: return n
+            shift += 7
+    count = varint()
+    table = []
+    for _ in range(count):
+        ln = varint()
+        table.append(buf[pos:pos+ln].decode("utf-8")); pos += ln
+    def dec():
+        nonlocal pos
+        tag = buf[pos]; pos += 1
+        if tag == _STR: return table[varint()]
+        if tag == _INT: return varint()
+        if tag == _DICT:
+            out = {}
+            for _ in range(varint()):
+                k = dec(); out[k] = dec()
+            return out
+        if tag == _LIST: return [dec() for _ in range(varint())]
+        if tag == _NONE: return None
+        if tag == _TRUE: return True
+        if tag == _FALSE: return False
+        if tag == _NEG: return -varint()
+        if tag == _FLOAT:
+            v = _F64.unpack_from(buf, pos)[0]; pos += 8
+            return v
+        raise ValueError(f"bad tag {tag} at {pos-1}")
+    return dec()
@@ -0,0 +1,31 @@
+"""
+Session-wide randomness and clock. Gameplay rolls (encounters, battles, loot, shop stock)
+draw from RNG, and gameplay timers read now(), so a session can be recorded and replayed
+exactly (see core.replay). Presentation-only jitter (screen shake) stays on `random`.
+UI code reads the pointer through mouse_pos(), which follows input events rather than
+the live OS cursor, so hover and drag targets replay exactly too.
+"""
+import random, time
+
+RNG = random.Random()
+_frame_time = None  # wall time frozen for the current frame (None: live time.time())
+_mouse_pos = (0, 0)  # pointer position from the latest input event that carried one
+
+def reseed(seed):
+    RNG.seed(seed)
+
+def set_frame_time(t):
+    """Freeze now() for this frame (Game.run does this every frame; replays feed recorded times)."""
+    global _frame_time
+    _frame_time = t
+
+def now() -> float:
+    return time.time() if _frame_time is None else _frame_time
+
+def set_mouse_pos(pos):
+    """Record the pointer position (InputController does this for every event with a pos)."""
+    global _mouse_pos
+    _mouse_pos = tuple(pos)
+
+def mouse_pos() -> tuple:
+    return _mouse_pos
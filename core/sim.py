@@ -0,0 +1,142 @@
+"""
+Headless balance simulator: runs CombatEngine fights with a seeded RNG and no display.
+
+    python -m core.sim --party FIGHTER,WHITE_MAGE --level 5 -n 10000 --seed 1
+"""
+import argparse, random, time
+from core.combat import CombatEngine, roll_encounter, steal_pool
+from core.entities import Hero, STARTER_GEAR
+from data.spells import get_spell
+
+class _NullLog(list):
+    """Battle log sink that drops everything (log text is irrelevant to balance runs)."""
+    def append(self, _msg): pass
+    def extend(self, _msgs): pass
+
+def build_party(classes, level=1, gear=True):
+    """Leader first; each member leveled to `level` and given its class starter kit."""
+    party = []
+    for i, cls in enumerate(classes):
+        cls = cls.upper()
+        m = Hero(hero_class=cls, name="Hero" if i == 0 else cls.title())
+        for _ in range(max(0, level - 1)):
+            m.level_up()
+        m.xp = 0
+        if gear:
+            for slot_name, iid in STARTER_GEAR.get(cls, {}).items():
+                m.equipment[slot_name] = iid
+        m.prune_illegal_spells()
+        party.append(m)
+    for m in party:
+        m.party = party
+    return party
+
+def reset_party(party):
+    for m in party:
+        m.hp = m.max_hp(); m.mp = m.max_mp()
+        m.status_effects.clear()
+        m.defending = False
+
+def spellbook(party):
+    """Castable spells per member (id(member) -> [(spell_id, spell)]), resolved once per run."""
+    return {id(m): [(sid, get_spell(sid)) for sid in m.known_spells if m.can_cast(sid)] for m in party}
+
+def auto_action(eng, book, robbed=None):
+    """
+    Simple policy: self-heal when low, else strongest affordable damage spell, else attack.
+    robbed: set of enemies already stolen from this battle (None = never steal); a thief
+    steals from the focused enemy until it succeeds or there is nothing to take, then attacks.
+    """
+    a = eng.active_actor
+    alive = eng.alive_enemies()
+    # focus the weakest enemy
+    hps = [e.hp for e in alive]
+    eng.cursor = hps.index(min(hps))
+    best, best_score = None, 0
+    spells = book[id(a)]
+    low = spells and a.hp * 3 < a.max_hp()
+    for sid, sp in spells:
+        if a.mp < sp["mp"]: continue
+        if sp["target"] == "ally":
+            if low and sp["power"] > 0:
+                eng.cast_spell(sid); return
+            continue
+        score = sp["power"] * (len(alive) if sp["aoe"] else 1)
+        if score > best_score:
+            best, best_score = sid, score
+    if best:
+        eng.cast_spell(best)
+    elif robbed is not None and a.hero_class == "THIEF" and eng.target() not in robbed \
+            and steal_pool(eng.target().species):
+        t = eng.target()
+        if eng.player_steal(): robbed.add(t)
+    else:
+        eng.player_attack()
+
+def simulate_battle(party, rng, book, max_rounds=100, steal=False, species=None):
+    """One fight from full health. Returns (won, rounds, xp, gil)."""
+    reset_party(party)
+    enemies = roll_encounter(party[0], rng, species) if species else None
+    eng = CombatEngine(party[0], enemies=enemies, rng=rng)
+    eng.log = _NullLog(); eng.verbose = False
+    robbed = set() if steal else None
+    rounds = 0
+    while rounds < max_rounds:
+        if eng.turn == "PLAYER":
+            auto_action(eng, book, robbed)
+        if eng.turn == "ENEMY":
+            eng.end_turn_sequence()
+            rounds += 1
+        if eng.is_over():
+            break
+    won = not eng.alive_enemies() and any(m.is_alive() for m in party)
+    return won, rounds, (eng.total_xp_yield if won else 0), eng.loot_gold
+
+def run_counts(classes, level=1, n=1000, seed=0, max_rounds=100, steal=False, species=None):
+    """Raw totals for n battles of one composition (summable across shards)."""
+    rng = random.Random(seed)
+    party = build_party(classes, level)
+    book = spellbook(party)
+    wins = rounds = xp = gil = 0
+    for _ in range(n):
+        w, r, x, g = simulate_battle(party, rng, book, max_rounds, steal, species)
+        wins += w; rounds += r; xp += x; gil += g
+    return {"battles": n, "wins": wins, "rounds": rounds, "xp": xp, "gil": gil}
+
+def summarize(counts):
+    n = max(1, counts["battles"])
+    return {"battles": counts["battles"], "win_rate": counts["wins"] / n,
+            "avg_rounds": counts["rounds"] / n, "avg_xp": counts["xp"] / n, "avg_gil": counts["gil"] / n}
+
+def run(classes, level=1, n=1000, seed=0, max_rounds=100, steal=False, species=None):
+    """Simulate n battles for one party composition; returns aggregate stats."""
+    t0 = time.perf_counter()
+    counts = run_counts(classes, level, n, seed, max_rounds, steal, species)
+    elapsed = time.perf_counter() - t0
+    st = {"party": "+".join(c.upper() for c in classes), "level": level}
+    st.update(summarize(counts))
+    st["battles_per_sec"] = n / elapsed if elapsed > 0 else float("inf")
+    return st
+
+def format_row(st):
+    return (f"{st['party']:<32} Lv{st['level']:<3} n={st['battles']:<7} win {st['win_rate']*100:5.1f}%  "
+            f"rounds {st['avg_rounds']:5.2f}  xp {st['avg_xp']:6.1f}  gil {st['avg_gil']:6.1f}  "
+            f"({st['battles_per_sec']:.0f} battles/s)")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Headless battle balance simulator.")
+    ap.add_argument("--party", action="append", default=None,
+                    help="comma-separated classes, leader first (repeatable)")
+    ap.add_argument("--level", type=int, default=1)
+    ap.add_argument("-n", "--battles", type=int, default=1000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--max-rounds", type=int, default=100)
+    ap.add_argument("--steal", action="store_true", help="thieves Steal from each enemy (until it works) before attacking it")
+    args = ap.parse_args(argv)
+    for spec in args.party or ["FIGHTER"]:
+        classes = [c.strip() for c in spec.split(",") if c.strip()]
+        st = run(classes, args.level, args.battles, args.seed, args.max_rounds, args.steal)
+        print(format_row(st))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Headless soak test: runs the full Game.update loop with scripted input, as fast as it can,
+and samples memory/throughput so leaks (ITEMS growth, logs, ground items, caches) show up.
+
+    python -m core.soak --minutes 120 --no-render --seed 1 --out soak.csv
+
+SDL uses the dummy video/audio drivers; saves go to a temp directory (see --workdir).
+"""
+import argparse, csv, gc, os, random, sys, tempfile, time
+
+class _Keys:
+    """pygame.key.get_pressed() stand-in backed by a set of held key codes."""
+    def __init__(self, held): self.held = held
+    def __getitem__(self, key): return key in self.held
+
+class ScriptedInput:
+    """Input source for InputController: queued events plus held keys."""
+    def __init__(self):
+        self.queue: list = []
+        self.held: set = set()
+
+    def events(self):
+        out, self.queue = self.queue, []
+        return out
+
+    def pressed(self):
+        return _Keys(self.held)
+
+    def press(self, key, unicode=""):
+        import pygame
+        self.queue.append(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode=unicode, scancode=0))
+        self.queue.append(pygame.event.Event(pygame.KEYUP, key=key, mod=0, unicode=unicode, scancode=0))
+
+    def click(self, pos, button=1):
+        import pygame
+        self.queue.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=button))
+        self.queue.append(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=pos, button=button))
+
+class RandomPlayer:
+    """
+    Wanders between points in the grass (so encounters fire), mashes through battles,
+    restarts on death, toggles overlays now and then and drops items on the ground.
+    Only ever talks to the game through ScriptedInput (plus Game._drop_to_ground for drops).
+    """
+    def __init__(self, inp: ScriptedInput, rng: random.Random, drops=True):
+        self.inp = inp; self.rng = rng; self.drops = drops
+        self.target = None
+
+    def tick(self, g, step):
+        import pygame
+        inp, rng = self.inp, self.rng
+        inp.held.clear()
+        if g.battle:
+            b = g.battle
+            if step % 4: return
+            party_alive = any(p.is_alive() for p in b.party)
+            if not party_alive:
+                inp.press(pygame.K_n)
+            elif not b.alive_enemies() or b.ran_away:
+                inp.press(pygame.K_RETURN)
+            else:
+                r = rng.random()
+                if r < 0.10: inp.press(rng.choice((pygame.K_UP, pygame.K_DOWN)))
+                elif r < 0.15: inp.press(pygame.K_BACKSPACE)
+                elif r < 0.18: inp.press(pygame.K_TAB)
+                else: inp.press(pygame.K_RETURN)
+            return
+        if g.hero_dead:
+            inp.press(pygame.K_n); return
+        if step % 240 == 0:  # occasionally flip an overlay (they also block movement when locked)
+            inp.press(rng.choice((pygame.K_i, pygame.K_j, pygame.K_c, pygame.K_h, pygame.K_l)))
+        if step % 600 == 300:  # close everything we may have opened
+            g.inv_open = g.char_open = g.journal_open = g.help_open = False
+        if self.drops and step % 90 == 0 and g.hero.inventory.counts:
+            iid = rng.choice(sorted(g.hero.inventory.counts))
+            if g.hero.inventory.take(iid, 1):
+                g._drop_to_ground(iid, 1)
+        if step % 120 == 60 and len(g.ground):
+            inp.press(pygame.K_g)
+        # walk toward a point in the grass
+        h = g.hero; gr = g.overworld.grass_rect
+        if self.target is None or abs(self.target[0] - h.x) + abs(self.target[1] - h.y) < 24:
+            self.target = (rng.randint(gr.left + 20, gr.right - 20), rng.randint(gr.top + 20, gr.bottom - 20))
+        tx, ty = self.target
+        if tx < h.x - 4: inp.held.add(pygame.K_LEFT)
+        elif tx > h.x + 4: inp.held.add(pygame.K_RIGHT)
+        if ty < h.y - 4: inp.held.add(pygame.K_UP)
+        elif ty > h.y + 4: inp.held.add(pygame.K_DOWN)
+
+def sample(g, step, t0, battles):
+    """One row of soak metrics."""
+    from data.inventory import ITEMS, DYNAMIC_ITEMS
+    from settings import TEXT_CACHE, TEXT_METRICS
+    from ui.icon_atlas import ICONS
+    row = {
+        "step": step, "elapsed_s": round(time.perf_counter() - t0, 1),
+        "steps_per_s": 0.0, "battles": battles,
+        "items": len(ITEMS), "dynamic_items": len(DYNAMIC_ITEMS.defs), "dynamic_refs": sum(DYNAMIC_ITEMS.refs.values()),
+        "inventory_ids": len(g.hero.inventory.counts), "ground": len(g.ground),
+        "battle_log": len(g.battle.log) if g.battle else 0,
+        "text_cache": TEXT_CACHE.stats()["entries"], "wrap_memo": len(TEXT_METRICS._wraps),
+        "atlas_dynamic": ICONS.stats()["dynamic"], "gc_objects": len(gc.get_objects()),
+    }
+    try:
+        import resource
+        row["maxrss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        row["maxrss_kb"] = 0
+    return row
+
+def soak(minutes=1.0, steps=None, seed=0, render=False, report_every=3600, out=None, drops=True, log=sys.stderr):
+    from main import Game
+    from core.gamedata import SAVER
+    from core import session
+    session.reseed(seed)
+    inp = ScriptedInput()
+    g = Game(fps_cap=None, headless=True, render=render, input_source=inp)
+    g.start_new_game("FIGHTER", "Soak", 1)
+    g.start_screen.deactivate()
+    player = RandomPlayer(inp, random.Random(seed), drops)
+
+    writer = None
+    if out:
+        f = open(out, "w", newline="")
+    rows, t0 = [], time.perf_counter()
+    deadline = t0 + minutes * 60.0
+    step = battles = 0; in_battle = False; last_t, last_step = t0, 0
+    try:
+        while (steps is None or step < steps) and (steps is not None or time.perf_counter() < deadline):
+            player.tick(g, step)
+            g.input.process_events()
+            g.step(g.sim_dt)
+            if render: g.draw()
+            if g.battle and not in_battle: battles += 1
+            in_battle = g.battle is not None
+            step += 1
+            if step % report_every == 0:
+                SAVER.flush()
+                row = sample(g, step, t0, battles)
+                now = time.perf_counter()
+                row["steps_per_s"] = round((step - last_step) / max(now - last_t, 1e-9))
+                last_t, last_step = now, step
+                rows.append(row)
+                if out:
+                    if writer is None:
+                        writer = csv.DictWriter(f, fieldnames=list(row)); writer.writeheader()
+                    writer.writerow(row); f.flush()
+                if log: log.write(" ".join(f"{k}={v}" for k, v in row.items()) + "\n")
+    finally:
+        SAVER.flush()
+        if out: f.close()
+    return rows
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Headless soak test of the full game loop.")
+    ap.add_argument("--minutes", type=float, default=1.0)
+    ap.add_argument("--steps", type=int, default=None, help="fixed step count instead of --minutes")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--render", dest="render", action="store_true", help="also draw every step (dummy display)")
+    ap.add_argument("--no-render", dest="render", action="store_false")
+    ap.set_defaults(render=False)
+    ap.add_argument("--no-drops", dest="drops", action="store_false", help="don't drop items on the ground")
+    ap.add_argument("--report-every", type=int, default=3600, help="steps between samples (60 = 1 sim second)")
+    ap.add_argument("--out", default=None, help="CSV of samples")
+    ap.add_argument("--workdir", default=None, help="where saves go (default: a fresh temp dir)")
+    args = ap.parse_args(argv)
+    if args.out: args.out = os.path.abspath(args.out)
+    os.chdir(args.workdir or tempfile.mkdtemp(prefix="ff_soak_"))
+    soak(args.minutes, args.steps, args.seed, args.render, args.report_every, args.out, args.drops)
+
+if __name__ == "__main__":
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    main()
@@ -0,0 +1,133 @@
+"""
+Multiprocess Monte Carlo balance sweep over hero level x class x party size x species mix.
+
+    python -m core.sweep --levels 1-20 --sizes 1-4 --species natural,GOBLIN,GOLEM+DRAGON \\
+        -n 4000 --shard-size 500 --workers 8 --out balance.csv
+
+Each configuration is split into shards with deterministic per-shard seeds, so a sweep
+gives identical numbers for any worker count. Shards run in a ProcessPoolExecutor and
+their totals are folded into the report as they complete.
+"""
+import argparse, csv, json, os, sys, time, zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from core.sim import run_counts, summarize
+from core.entities import Enemy
+
+CLASSES = ["FIGHTER", "THIEF", "BLACK_MAGE", "WHITE_MAGE"]
+
+def parse_range(text):
+    """'1-20' or '1,5,10' -> list of ints."""
+    out = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part: continue
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            out.extend(range(int(lo), int(hi) + 1))
+        else:
+            out.append(int(part))
+    return out
+
+def party_for(leader, size, classes=CLASSES):
+    """Leader plus the next distinct classes (tavern allows one hire per class)."""
+    others = [c for c in classes if c != leader]
+    return (leader,) + tuple(others[:max(0, size - 1)])
+
+def shard_seed(base_seed, key, shard):
+    # crc32 of the config, not hash(): stable across processes and runs
+    return zlib.crc32(repr((base_seed, key, shard)).encode()) & 0x7FFFFFFF
+
+def _run_shard(task):
+    key, level, party, species, n, seed, max_rounds = task
+    return key, run_counts(list(party), level, n, seed, max_rounds, species=species)
+
+def build_tasks(levels, leaders, sizes, mixes, n, shard_size, base_seed, max_rounds):
+    tasks, configs = [], {}
+    for level in levels:
+        for leader in leaders:
+            for size in sizes:
+                party = party_for(leader, size)
+                if len(party) < size: continue
+                for mix_name, species in mixes:
+                    key = (level, "+".join(party), mix_name)
+                    configs[key] = {"battles": 0, "wins": 0, "rounds": 0, "xp": 0, "gil": 0}
+                    left, shard = n, 0
+                    while left > 0:
+                        m = min(shard_size, left)
+                        tasks.append((key, level, party, species, m,
+                                      shard_seed(base_seed, key, shard), max_rounds))
+                        left -= m; shard += 1
+    return tasks, configs
+
+def report_rows(configs):
+    rows = []
+    for (level, party, mix), counts in sorted(configs.items()):
+        row = {"level": level, "party": party, "size": party.count("+") + 1, "species": mix}
+        row.update(summarize(counts))
+        rows.append(row)
+    return rows
+
+def write_report(rows, path):
+    if path.lower().endswith(".json"):
+        with open(path, "w") as f: json.dump(rows, f, indent=1)
+        return
+    with open(path, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=list(rows[0].keys()) if rows else ["level"])
+        w.writeheader()
+        w.writerows(rows)
+
+def sweep(levels, leaders, sizes, mixes, n=1000, shard_size=500, seed=0,
+          max_rounds=100, workers=None, progress=None):
+    """Run the whole grid; returns report rows. `progress(done, total)` is called as shards land."""
+    tasks, configs = build_tasks(levels, leaders, sizes, mixes, n, shard_size, seed, max_rounds)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_shard, t) for t in tasks]
+        for done, fut in enumerate(as_completed(futures), 1):
+            key, counts = fut.result()
+            agg = configs[key]
+            for k, v in counts.items():
+                agg[k] += v
+            if progress: progress(done, len(tasks))
+    return report_rows(configs)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Multiprocess battle balance sweep.")
+    ap.add_argument("--levels", default="1-20")
+    ap.add_argument("--classes", default=",".join(CLASSES), help="leader classes to sweep")
+    ap.add_argument("--sizes", default="1-4", help="party sizes (leader + companions)")
+    ap.add_argument("--species", default="natural",
+                    help="comma-separated mixes: 'natural' (normal encounter pool) or SPECIES+SPECIES")
+    ap.add_argument("-n", "--battles", type=int, default=1000, help="battles per configuration")
+    ap.add_argument("--shard-size", type=int, default=500)
+    ap.add_argument("--workers", type=int, default=None, help="default: all cores")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--max-rounds", type=int, default=100)
+    ap.add_argument("--out", default="balance_report.csv", help=".csv or .json")
+    args = ap.parse_args(argv)
+
+    mixes = []
+    for m in args.species.split(","):
+        m = m.strip().upper()
+        if not m: continue
+        if m == "NATURAL":
+            mixes.append((m.lower(), None)); continue
+        species = m.split("+")
+        unknown = [sp for sp in species if sp not in Enemy.BASE_HP]
+        if unknown:
+            ap.error(f"unknown species {', '.join(unknown)} (choose from {', '.join(Enemy.BASE_HP)})")
+        mixes.append((m, species))
+    leaders = [c.strip().upper() for c in args.classes.split(",") if c.strip()]
+
+    t0 = time.perf_counter()
+    def progress(done, total):
+        sys.stderr.write(f"\r{done}/{total} shards"); sys.stderr.flush()
+    rows = sweep(parse_range(args.levels), leaders, parse_range(args.sizes), mixes,
+                 args.battles, args.shard_size, args.seed, args.max_rounds, args.workers, progress)
+    elapsed = time.perf_counter() - t0
+    write_report(rows, args.out)
+    total = sum(r["battles"] for r in rows)
+    sys.stderr.write(f"\n{total} battles in {elapsed:.1f}s ({total/max(elapsed,1e-9):.0f}/s, "
+                     f"{args.workers or os.cpu_count()} workers) -> {args.out}\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+"""
+Reference word wrap: measures every candidate line with font.size(). Slow, but exactly
+the greedy result settings.TextMetrics must reproduce; tests/test_wrap.py checks against
+it and `python bench/bench.py wrap` times it. Not used by the game.
+"""
+
+def wrap_text_naive(text, font, max_width):
+    words, lines, line = text.split(), [], ""
+    for w in words:
+        test = w if not line else f"{line} {w}"
+        if font.size(test)[0] <= max_width: line = test
+        else:
+            if line: lines.append(line)
+            line = w
+    if line: lines.append(line)
+    return lines
@@ -1,30 +1,105 @@
 from settings import *
 from data.spells import get_spell
 import random as _rnd
+import sys, warnings, weakref
 
 EQUIP_SLOTS = ["weapon","helm","armor","shield"]  # Shield doubles as offhand for Thief
 
+# ---- Stat vector layout: every ItemDef's stats are a tuple in this fixed order ----
+STAT_KEYS = tuple(sys.intern(k) for k in ("attack", "magic", "defense", "hp", "mp", "agility")) \
+          + tuple(sys.intern(f"res_{t}") for t in GEN1_TYPES)
+STAT_INDEX = {k: i for i, k in enumerate(STAT_KEYS)}
+N_STATS = len(STAT_KEYS)
+ATTACK, MAGIC, DEFENSE, HP, MP, AGILITY = range(6)
+_VECTORS: dict = {}   # interned stat vectors (identical stat lines share one tuple)
+_ORDERS: dict = {}    # interned stat-key orders (as written in the item's stats dict)
+_CLONED_STATS: dict = {}  # (vec, stat_order, added stats) -> clone_with's merged (vec, stat_order, extra)
+
+def stat_vector(stats=None) -> tuple:
+    """Interned fixed-order stat tuple for a {key: value} mapping (keys outside STAT_KEYS are skipped)."""
+    vec = [0] * N_STATS
+    for k, v in (stats or {}).items():
+        i = STAT_INDEX.get(k)
+        if i is not None: vec[i] += v
+    vec = tuple(vec)
+    return _VECTORS.setdefault(vec, vec)
+
+def add_vectors(a: tuple, b: tuple) -> tuple:
+    vec = tuple(map(int.__add__, a, b))
+    return _VECTORS.setdefault(vec, vec)
+
+def _stat_order(keys) -> tuple:
+    keys = tuple(map(sys.intern, keys))
+    return _ORDERS.setdefault(keys, keys)
+
+def _unknown_stats(stats):
+    """Stats outside STAT_KEYS (old or modded saves): kept as an overflow dict, with a warning."""
+    extra = {k: v for k, v in stats.items() if k not in STAT_INDEX}
+    if not extra: return None
+    warnings.warn(f"item stats not in STAT_KEYS kept as extra stats: {', '.join(map(str, extra))}",
+                  stacklevel=3)
+    return extra
+
 class ItemDef:
+    """
+    Item definition. __slots__ (no per-instance dict) plus an interned stat vector `vec`;
+    `stats` rebuilds the {key: value} dict it was defined with (same keys, same order,
+    zero entries included). Keys outside STAT_KEYS live in `extra` and count for nothing.
+    """
+    __slots__ = ("id", "name", "kind", "price", "desc", "slot", "vec", "stat_order", "extra",
+                 "use_effect", "unlock_spell", "value", "quality", "dynamic", "__weakref__")
+
     def __init__(self, id, name, kind, price=10, desc="", slot=None,
                  stats=None, use_effect=None, unlock_spell=None, value=0,
-                 quality="COMMON", dynamic=False):
-        self.id=id; self.name=name; self.kind=kind; self.price=price; self.desc=desc
-        self.slot=slot; self.stats=stats or {}
+                 quality="COMMON", dynamic=False, vec=None, stat_order=None, extra=None):
+        self.id=id; self.name=name; self.kind=sys.intern(kind); self.price=price; self.desc=desc
+        self.slot=sys.intern(slot) if slot else slot
+        if vec is None:
+            stats = stats or {}
+            vec, stat_order, extra = stat_vector(stats), _stat_order(stats), _unknown_stats(stats)
+        elif stat_order is None:
+            stat_order = _stat_order(k for k, v in zip(STAT_KEYS, vec) if v)
+        self.vec = vec
+        self.stat_order = stat_order
+        self.extra = extra  # None, or {key: value} shared with clones (never mutated)
         self.use_effect=use_effect
         self.unlock_spell=unlock_spell
         self.value=value
-        self.quality = quality
+        self.quality = sys.intern(quality)
         self.dynamic = dynamic  # NEW: generated at runtime
 
+    @property
+    def stats(self) -> dict:
+        vec, extra = self.vec, self.extra
+        return {k: vec[STAT_INDEX[k]] if k in STAT_INDEX else extra[k] for k in self.stat_order}
+
+    def stat(self, key) -> int:
+        i = STAT_INDEX.get(key)
+        if i is None: return self.extra.get(key, 0) if self.extra else 0
+        return self.vec[i]
+
     def clone_with(self, new_id, new_name, added_stats, price_mult, quality):
-        merged = dict(self.stats)
-        for k, v in added_stats.items():
-            merged[k] = merged.get(k, 0) + v
+        key = (self.vec, self.stat_order, tuple(added_stats.items()))
+        merged = _CLONED_STATS.get(key) if self.extra is None else None
+        if merged is None:
+            merged = self._merge_stats(added_stats)
+            if self.extra is None: _CLONED_STATS[key] = merged
+        vec, order, extra = merged
         return ItemDef(new_id, new_name, self.kind,
                        price=max(1, int(self.price * price_mult)),
-                       desc=self.desc, slot=self.slot,
-                       stats=merged, unlock_spell=self.unlock_spell,
-                       quality=quality, dynamic=True)
+                       desc=self.desc, slot=self.slot, vec=vec, stat_order=order, extra=extra,
+                       unlock_spell=self.unlock_spell, quality=quality, dynamic=True)
+
+    def _merge_stats(self, added_stats) -> tuple:
+        """(vec, stat_order, extra) of this def's stats plus added_stats."""
+        order, extra = self.stat_order, self.extra
+        new_keys = [k for k in added_stats if k not in order]
+        if new_keys: order = _stat_order(order + tuple(new_keys))
+        unknown = _unknown_stats(added_stats)
+        if unknown:
+            extra = dict(extra or {})
+            for k, v in unknown.items(): extra[k] = extra.get(k, 0) + v
+        return add_vectors(self.vec, stat_vector(added_stats)), order, extra
 
 def _use_potion(hero):
     old=hero.hp; hero.hp=clamp(hero.hp+40,0,hero.max_hp()); return f"Used Potion. +{hero.hp-old} HP."
@@ -105,6 +180,163 @@ ITEMS = {
                             desc="Balanced elemental ward"),
 }
 
+# --- Category indexes (kind / slot / quality / origin), maintained on (un)registration ---
+class ItemIndex:
+    """
+    Ordered id sets per category, so "all static gear" or "everything for the weapon slot"
+    is a dict lookup instead of a scan of ITEMS. Queries return a cached tuple that is only
+    rebuilt after that category changed, so dynamic churn never touches the static views.
+    """
+    def __init__(self, defs=()):
+        self._sets: dict = {}    # key -> {iid: None} (insertion-ordered set)
+        self._views: dict = {}   # key -> tuple snapshot of _sets[key]
+        for d in defs: self.add(d)
+
+    @staticmethod
+    def _keys(d):
+        origin = "dynamic" if d.dynamic else "static"
+        keys = [("kind", d.kind), ("kind", d.kind, origin), ("quality", d.quality), ("origin", origin)]
+        if d.slot:
+            keys += [("slot", d.slot), ("slot", d.slot, origin)]
+        return keys
+
+    def add(self, d):
+        for key in self._keys(d):
+            self._sets.setdefault(key, {})[d.id] = None
+            self._views.pop(key, None)
+
+    def remove(self, d):
+        for key in self._keys(d):
+            ids = self._sets.get(key)
+            if ids is not None and ids.pop(d.id, 0) is None:
+                self._views.pop(key, None)
+
+    def ids(self, *key) -> tuple:
+        v = self._views.get(key)
+        if v is None:
+            v = self._views[key] = tuple(self._sets.get(key, ()))
+        return v
+
+    @staticmethod
+    def _origin(dynamic):
+        return () if dynamic is None else ("dynamic" if dynamic else "static",)
+
+    def by_kind(self, kind, dynamic=None) -> tuple: return self.ids("kind", kind, *self._origin(dynamic))
+    def by_slot(self, slot, dynamic=None) -> tuple: return self.ids("slot", slot, *self._origin(dynamic))
+    def by_quality(self, quality) -> tuple: return self.ids("quality", quality)
+    def static_ids(self) -> tuple: return self.ids("origin", "static")
+    def dynamic_ids(self) -> tuple: return self.ids("origin", "dynamic")
+
+ITEM_INDEX = ItemIndex(ITEMS.values())
+
+# --- Dynamic (generated) item defs: refcounted, collected when nothing holds them ---
+DYNAMIC_ITEM_LIMIT = 512      # soft cap: over this the next safe point collects
+DYNAMIC_COLLECT_EVERY = 60.0  # seconds between routine collections
+
+class ItemRefs:
+    """
+    One holder's references to dynamic item ids (an inventory, a hero's equipment, the ground,
+    the shop stock). Counts repeats (two stacks on the ground = 2). Everything still held is
+    released when the owner is garbage collected, so dropped heroes don't pin defs.
+    """
+    __slots__ = ("reg", "held")
+    def __init__(self, reg, owner):
+        self.reg = reg
+        self.held: dict = {}   # iid -> count (same dict object for the owner's lifetime)
+        weakref.finalize(owner, reg._release, self.held)
+
+    def hold(self, iid):
+        if iid in self.reg.static: return
+        h = self.held; h[iid] = h.get(iid, 0) + 1
+        self.reg._ref(iid, 1)
+
+    def release(self, iid):
+        h = self.held; n = h.get(iid)
+        if not n: return
+        if n == 1: del h[iid]
+        else: h[iid] = n - 1
+        self.reg._ref(iid, -1)
+
+    def reset(self, ids):
+        """Hold exactly `ids` (None/static entries ignored)."""
+        static = self.reg.static; new = {}
+        for iid in ids:
+            if iid and iid not in static: new[iid] = new.get(iid, 0) + 1
+        self.reg._release(self.held)
+        for iid, n in new.items(): self.reg._ref(iid, n)
+        self.held.update(new)
+
+class DynamicItemRegistry:
+    """
+    Generated ItemDefs (affixed gear, defs rebuilt from saves). They live in ITEMS like static
+    items, so lookups stay plain dict hits, but this registry owns them. It keeps a refcount per
+    id from every ItemRefs holder, and collect() removes defs nobody holds. Defs registered
+    since the previous collection get one pass of grace, e.g. loot rolled but not yet added.
+    """
+    def __init__(self, items, index=None, limit=DYNAMIC_ITEM_LIMIT, interval=DYNAMIC_COLLECT_EVERY):
+        self.items = items
+        self.index = index
+        self.static = frozenset(items)
+        self.defs: dict = {}     # iid -> ItemDef
+        self.refs: dict = {}     # iid -> holder count (> 0 only)
+        self.limit = limit; self.interval = interval
+        self._young: set = set()
+        self._last_collect = None
+        self.created = self.collected = self.collections = 0
+
+    def register(self, idef) -> str:
+        iid = idef.id
+        if iid not in self.items:
+            self.items[iid] = self.defs[iid] = idef
+            if self.index is not None: self.index.add(idef)
+            self._young.add(iid)
+            self.created += 1
+        return iid
+
+    def holder(self, owner) -> ItemRefs:
+        return ItemRefs(self, owner)
+
+    def _ref(self, iid, n):
+        c = self.refs.get(iid, 0) + n
+        if c > 0: self.refs[iid] = c
+        else: self.refs.pop(iid, None)
+
+    def _release(self, held):
+        for iid, n in held.items(): self._ref(iid, -n)
+        held.clear()
+
+    def collect(self) -> int:
+        """Remove unreferenced dynamic defs from ITEMS; returns how many went."""
+        young, self._young = self._young, set()
+        refs = self.refs
+        dead = [iid for iid in self.defs if iid not in refs and iid not in young]
+        for iid in dead:
+            del self.items[iid]
+            idef = self.defs.pop(iid)
+            if self.index is not None: self.index.remove(idef)
+        self.collected += len(dead); self.collections += 1
+        return len(dead)
+
+    def maybe_collect(self, t) -> int:
+        """Collect when over the soft cap or every `interval` seconds (call at a safe point)."""
+        if self._last_collect is None: self._last_collect = t
+        if len(self.defs) > self.limit or t - self._last_collect >= self.interval:
+            self._last_collect = t
+            return self.collect()
+        return 0
+
+    def stats(self) -> dict:
+        held = sum(1 for iid in self.defs if iid in self.refs)
+        vecs = {id(d.vec): d.vec for d in self.defs.values()}  # shared vectors counted once
+        size = sum(sys.getsizeof(d) + sys.getsizeof(d.id) + sys.getsizeof(d.name) for d in self.defs.values()) \
+             + sum(map(sys.getsizeof, vecs.values()))
+        return {"static": len(self.static), "dynamic": len(self.defs), "referenced": held,
+                "unreferenced": len(self.defs) - held, "refs": sum(self.refs.values()),
+                "created": self.created, "collected": self.collected, "collections": self.collections,
+                "dynamic_kb": round(size / 1024, 1)}
+
+DYNAMIC_ITEMS = DynamicItemRegistry(ITEMS, ITEM_INDEX)
+
 # --- NEW: buy/sell helpers ---
 def item_buy_price(item_id): return ITEMS[item_id].price
 def item_sell_price(item_id): return max(1, int(item_buy_price(item_id) * 0.45))
@@ -112,9 +344,9 @@ def item_sell_price(item_id): return max(1, int(item_buy_price(item_id) * 0.45))
 def item_price(item_id): return item_buy_price(item_id)
 
 # --- Affix generation utilities ---
-def _pick_affix(table):
+def _pick_affix(table, rng=_rnd):
     total = sum(a["weight"] for a in table)
-    r = _rnd.uniform(0, total)
+    r = rng.uniform(0, total)
     acc = 0
     for a in table:
         acc += a["weight"]
@@ -122,14 +354,14 @@ def _pick_affix(table):
             return a
     return None
 
-def generate_affixed_equipment(base_id: str) -> str:
+def generate_affixed_equipment(base_id: str, rng=_rnd) -> str:
     """Create (or reuse) a composite id for prefixed/suffixed gear."""
     base = ITEMS[base_id]
     if base.kind != "equipment":
         return base_id
     # 50% prefix, 50% suffix (independent)
-    prefix = _pick_affix(AFFIX_PREFIXES) if _rnd.random() < 0.5 else None
-    suffix = _pick_affix(AFFIX_SUFFIXES) if _rnd.random() < 0.5 else None
+    prefix = _pick_affix(AFFIX_PREFIXES, rng) if rng.random() < 0.5 else None
+    suffix = _pick_affix(AFFIX_SUFFIXES, rng) if rng.random() < 0.5 else None
     if not prefix and not suffix:
         return base_id
     parts_stats = {}
@@ -160,27 +392,64 @@ def generate_affixed_equipment(base_id: str) -> str:
     if suffix: new_id += f"#S{suffix['id']}"
     if new_id in ITEMS:
         return new_id
-    ITEMS[new_id] = base.clone_with(new_id, new_name, parts_stats, price_mult, quality)
-    return new_id
+    return DYNAMIC_ITEMS.register(base.clone_with(new_id, new_name, parts_stats, price_mult, quality))
 
 class Inventory:
+    """
+    item_id -> qty. Observable: subscribers get (item_id, delta) for each change, or
+    (None, 0) when `counts` is replaced wholesale (e.g. on load).
+    """
     def __init__(self):
-        self.counts = {}     # item_id -> qty
+        self._counts = {}     # item_id -> qty
+        self._listeners = []
+        self._refs = DYNAMIC_ITEMS.holder(self)  # keeps held dynamic defs alive
+
+    @property
+    def counts(self): return self._counts
+
+    @counts.setter
+    def counts(self, value):
+        self._counts = dict(value)
+        self._refs.reset(self._counts)
+        self._emit(None, 0)
+
+    def subscribe(self, fn):
+        if fn not in self._listeners: self._listeners.append(fn)
+
+    def unsubscribe(self, fn):
+        if fn in self._listeners: self._listeners.remove(fn)
+
+    def _emit(self, item_id, delta):
+        for fn in self._listeners: fn(item_id, delta)
 
     def add(self, item_id, qty=1):
-        self.counts[item_id] = self.counts.get(item_id,0) + qty
+        old = self._counts.get(item_id,0)
+        self._counts[item_id] = old + qty
+        if not old: self._refs.hold(item_id)
+        self._emit(item_id, qty)
 
     def take(self, item_id, qty=1):
-        if self.counts.get(item_id,0) >= qty:
-            self.counts[item_id]-=qty
-            if self.counts[item_id]<=0: del self.counts[item_id]
+        if self._counts.get(item_id,0) >= qty:
+            self._counts[item_id]-=qty
+            if self._counts[item_id]<=0:
+                del self._counts[item_id]; self._refs.release(item_id)
+            self._emit(item_id, -qty)
             return True
         return False
 
-    def qty(self, item_id): return self.counts.get(item_id,0)
+    def set_qty(self, item_id, qty):
+        old = self._counts.get(item_id, 0)
+        if qty > 0: self._counts[item_id] = qty
+        else: self._counts.pop(item_id, None)
+        if (old > 0) != (qty > 0):
+            if qty > 0: self._refs.hold(item_id)
+            else: self._refs.release(item_id)
+        if qty != old: self._emit(item_id, max(qty, 0) - old)
+
+    def qty(self, item_id): return self._counts.get(item_id,0)
 
     def all_items(self):  # list of (id, qty)
-        return sorted(self.counts.items())
+        return sorted(self._counts.items())
 
 def use_item(hero, item_id):
     idef = ITEMS[item_id]
@@ -200,7 +469,8 @@ def use_item(hero, item_id):
         return f"Learned {idef.unlock_spell}!"
     return "Cannot use that."
 
-def equippable_for_slot(slot):
-    return [k for k,v in ITEMS.items() if v.kind=="equipment" and v.slot==slot]
+def equippable_for_slot(slot, dynamic=None) -> tuple:
+    """Equipment ids for a slot (static and/or dynamic), from the index."""
+    return ITEM_INDEX.by_slot(slot, dynamic)
 
 def item_name(item_id): return ITEMS[item_id].name
@@ -1,28 +1,60 @@
 # main.py
-import pygame, sys, time
+import time
+_T0 = time.perf_counter()  # startup report origin (before pygame / settings imports)
+import pygame, os, sys, argparse
+from contextlib import contextmanager
 from settings import *
-from core.entities import Hero
+from core.entities import Hero, STARTER_GEAR
 from core.overworld import Overworld
 from core.battle import Battle
-from core.gamedata import save_game, load_game
-from data.inventory import use_item, ITEMS, item_sell_price
-from ui.shop import Shop
-from ui.inventory_ui import InventoryUI
+from core.gamedata import load_game, SAVER, SAVE_SLOTS, set_slot_format
+from data.inventory import use_item, ITEMS, DYNAMIC_ITEMS, item_sell_price
 from world.ground import GroundManager
-from ui.ui_overlays import CharacterSheet, JournalOverlay
 from core.inputs import InputController
-from ui.help_overlay import HelpOverlay
-from ui.talent_overlay import TalentOverlay
-from ui.tavern import Tavern
-from ui.party_overlay import PartyOverlay
+from core.renderer import DirtyRenderer
+from core.profiler import FrameProfiler, StartupTimer
+from core import session
 from ui.start_screen import StartScreen
 
+class _overlay:
+    """
+    Game attribute built on first access (then a plain instance attribute), so overlays
+    and their modules cost nothing until the player opens them. Build time goes in the
+    startup report.
+    """
+    def __init__(self, build):
+        self.build = build
+        self.name = build.__name__
+
+    def __get__(self, g, owner=None):
+        if g is None: return self
+        t0 = time.perf_counter()
+        ui = g.__dict__[self.name] = self.build(g)
+        g.startup.mark(f"overlay {self.name}", t0)
+        return ui
+
 class Game:
-    def __init__(self):
+    def __init__(self, fps_cap=FPS_CAP, render_skip=False, headless=False, render=True, input_source=None,
+                 startup_report=False):
+        self.startup = StartupTimer(_T0, verbose=startup_report)
+        self.startup.mark("imports")
+        if headless:  # no window / audio device (CI, soak runs); must precede display init
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+        self.headless = headless
+        self.render = render             # False: never draw (simulation only)
         pygame.init()
+        self.startup.mark("pygame.init")
         pygame.display.set_caption("Final Fantasy: Shapes & Spells")
         self.screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
+        self.startup.mark("display")
         self.clock = pygame.time.Clock()
+        self.fps_cap = fps_cap           # None: render as fast as possible
+        self.render_skip = render_skip   # drop frames (not sim steps) when falling behind
+        self.sim_dt = 1.0 / SIM_HZ
+        self.alpha = 0.0                 # render interpolation between last two sim steps
+        self._prev_hero_pos = None
+        self.recorder = None             # core.replay.Recorder while recording (--record)
 
         # Core entities/state
         self.hero = Hero()
@@ -35,17 +67,15 @@ class Game:
         self.current_save_slot = 1
         self.base_hire_cost = 140
 
-        # UI / overlays
-        self.inv_ui = InventoryUI(self.hero, pos=(24, 24), cols=8, rows=4)
+        # UI / overlays (built on first use, see the _overlay properties below)
         self.inv_open = False
-        self.shop = Shop()
         self.ground = GroundManager()
-        self.char_sheet = CharacterSheet(self.hero); self.char_open = False
-        self.journal = JournalOverlay(self.hero); self.journal_open = False
-        self.help = HelpOverlay(); self.help_open = False
-        self.talent = TalentOverlay(self.hero); self.talent_open = False
-        self.tavern = Tavern(self); self.tavern_open = False
-        self.party_ui = PartyOverlay(self); self.party_open = False
+        self.char_open = False
+        self.journal_open = False
+        self.help_open = False
+        self.talent_open = False
+        self.tavern_open = False
+        self.party_open = False
 
         self.auto_loot = False
         self.exit_confirm_until = 0.0
@@ -54,17 +84,78 @@ class Game:
         # overworld KO flag (outside battle)
         self.hero_dead = False
 
-        # Wire shop / inventory
-        self.shop.connect(
+        self.input = InputController(self, input_source)
+        self.renderer = DirtyRenderer(self)  # NEW: dirty-rect overworld presenter
+        self.profiler = FrameProfiler()      # F3 overlay / F4 CSV dump
+        self.startup.mark("game state")
+
+    # ---------- Overlays (lazy) ----------
+    @_overlay
+    def inv_ui(self):
+        from ui.inventory_ui import InventoryUI
+        ui = InventoryUI(self.hero, pos=(24, 24), cols=8, rows=4)
+        ui.is_over_shop = lambda pos: self.shop_open and self.shop.is_over(pos)
+        ui.on_sell = self._try_sell_stack
+        ui.on_drop_to_ground = self._drop_to_ground
+        ui.on_message = lambda msg: self.overworld.set_toast(msg)
+        return ui
+
+    @_overlay
+    def shop(self):
+        from ui.shop import Shop
+        shop = Shop()
+        shop.connect(
             get_gold=lambda: self.hero.gil,
             add_gold=lambda n: setattr(self.hero, "gil", max(0, self.hero.gil + n)),
             try_add_to_inventory=self._try_add_to_inventory
         )
-        self.inv_ui.is_over_shop = lambda pos: self.shop.is_over(pos) and self.shop.opened
-        self.inv_ui.on_sell = self._try_sell_stack
-        self.inv_ui.on_drop_to_ground = self._drop_to_ground
+        return shop
+
+    @_overlay
+    def char_sheet(self):
+        from ui.ui_overlays import CharacterSheet
+        return CharacterSheet(self.hero)
+
+    @_overlay
+    def journal(self):
+        from ui.ui_overlays import JournalOverlay
+        return JournalOverlay(self.hero)
 
-        self.input = InputController(self)
+    @_overlay
+    def help(self):
+        from ui.help_overlay import HelpOverlay
+        return HelpOverlay()
+
+    @_overlay
+    def talent(self):
+        from ui.talent_overlay import TalentOverlay
+        return TalentOverlay(self.hero)
+
+    @_overlay
+    def tavern(self):
+        from ui.tavern import Tavern
+        return Tavern(self)
+
+    @_overlay
+    def party_ui(self):
+        from ui.party_overlay import PartyOverlay
+        return PartyOverlay(self)
+
+    def built(self, name):
+        """The overlay if it has been constructed, else None (never builds it)."""
+        return self.__dict__.get(name)
+
+    @property
+    def shop_open(self) -> bool:
+        shop = self.built("shop")
+        return shop is not None and shop.opened
+
+    def _rebind_hero(self):
+        """Point the hero-bound overlays that exist at the current hero."""
+        for name in ("inv_ui", "char_sheet", "journal"):
+            ui = self.built(name)
+            if ui is not None: ui.hero = self.hero
+        if self.built("inv_ui"): self.inv_ui.reload_from_hero()
 
     # ---------- Utility ----------
     @property
@@ -76,9 +167,9 @@ class Game:
         return int(self.base_hire_cost * (1 + 0.35 * (len(self.party)-1)))
 
     def _try_add_to_inventory(self, item_id: str, qty: int) -> bool:
-        ok = self.inv_ui.grid.add_stack(item_id, qty)
-        if ok: self.inv_ui.commit_to_hero()
-        return ok
+        if not self.inv_ui.grid.fits(item_id, qty): return False
+        self.hero.inventory.add(item_id, qty)  # grid follows via the inventory delta
+        return True
 
     def _try_sell_stack(self, item_id: str, qty: int):
         self.hero.gil += item_sell_price(item_id) * qty
@@ -87,8 +178,8 @@ class Game:
         drop_pos = (int(self.hero.x), int(self.hero.y + self.hero.w//2 + 28))
         self.ground.drop(drop_pos, item_id, qty, ttl=60.0)
 
-    def _pickup_ground_at(self, pos):
-        got = self.ground.pick_at(pos)
+    def _pickup_ground_at(self, pos, item=None):
+        got = self.ground.take(item) if item else self.ground.pick_at(pos)
         if not got: return
         item_id, qty = got
         if not self._try_add_to_inventory(item_id, qty):
@@ -99,42 +190,27 @@ class Game:
                 self.overworld.set_toast(f"Picked {ITEMS[item_id].name} x{qty}")
 
     def _pickup_nearest_ground(self, radius=96):
-        if not self.ground.items: return
-        hx, hy = self.hero.x, self.hero.y
-        nearest = None; best = radius*radius
-        for g in self.ground.items:
-            d2 = (g.pos.x-hx)**2 + (g.pos.y-hy)**2
-            if d2 <= best:
-                best = d2; nearest = g
+        nearest = self.ground.nearest((self.hero.x, self.hero.y), radius)
         if nearest:
-            self._pickup_ground_at((int(nearest.pos.x), int(nearest.pos.y)))
+            self._pickup_ground_at((int(nearest.pos.x), int(nearest.pos.y)), nearest)
 
     # ---------- Start / New / Load ----------
     def start_new_game(self, cls: str, name: str, slot: int | None = None):
         self.hero = Hero(hero_class=cls, name=name or "Hero")
-        def _equip(slot, iid):
+        for slot_name, iid in STARTER_GEAR.get(cls, {}).items():
             if iid in ITEMS:
                 self.hero.inventory.add(iid, 1)
-                self.hero.equipment[slot] = iid
-        if cls == "FIGHTER":
-            _equip("weapon", "WOOD_SWORD"); _equip("armor", "LEATHER_ARM")
-        elif cls == "THIEF":
-            _equip("weapon", "WOOD_SWORD")
-        elif cls == "BLACK_MAGE":
-            _equip("armor", "MAGE_ROBE")
-        elif cls == "WHITE_MAGE":
-            _equip("armor", "MAGE_ROBE")
+                self.hero.equipment[slot_name] = iid
         self.party = [self.hero]; self.hero.party = self.party
         self.overworld.hero = self.hero
-        self.inv_ui.hero = self.hero
-        self.char_sheet.hero = self.hero
-        self.journal.hero = self.hero
+        self._rebind_hero()
         if slot is not None:
             self.current_save_slot = slot
-        # Auto-save immediately
-        save_game(self.hero, self.current_save_slot)
-        if hasattr(self.overworld, "set_toast"):
-            self.overworld.set_toast(f"New journey saved (Slot {self.current_save_slot}).")
+        # Auto-save immediately (written in the background)
+        slot_n = self.current_save_slot
+        SAVER.submit(self.hero, slot_n,
+                     lambda msg: self.overworld.set_toast(
+                         f"New journey saved (Slot {slot_n})." if msg.startswith("Saved") else msg))
 
     def load_save_slot(self, slot: int):
         msg = load_game(self.hero, slot)
@@ -142,26 +218,83 @@ class Game:
         self.party = getattr(self.hero, "party", [self.hero])
         self.hero.party = self.party
         self.overworld.hero = self.hero
-        self.inv_ui.hero = self.hero
-        self.char_sheet.hero = self.hero
-        self.journal.hero = self.hero
+        self._rebind_hero()
         # --- refresh UIs so class / party layout reflect loaded data ---
-        self.inv_ui.refresh_party_layout()
-        self.party_ui.sync_from_party()
+        if self.built("inv_ui"): self.inv_ui.refresh_party_layout()
+        if self.built("party_ui"): self.party_ui.sync_from_party()
         if hasattr(self.overworld, "set_toast"): self.overworld.set_toast(msg)
         self.start_screen.deactivate()
 
     # ---------- Game Loop ----------
     def run(self):
-        last = time.time()
-        while True:
-            now = time.time(); dt = now - last; last = now
-            self.input.process_events()
-            self.update(dt)
-            self.draw()
-            self.clock.tick(60)
+        """
+        Fixed-timestep loop on a monotonic clock: update() always advances the game by
+        sim_dt (so movement and per-poll encounter odds don't depend on frame rate);
+        draw() interpolates the hero between the last two steps.
+        """
+        prof = self.profiler
+        dt = self.sim_dt
+        rec = self.recorder
+        if rec: rec.start(self)
+        last = time.perf_counter(); acc = 0.0; skipped = 0
+        first = True
+        try:
+            while True:
+                now = time.perf_counter(); acc += now - last; last = now
+                frame_t = time.time()
+                session.set_frame_time(frame_t)  # gameplay timers read this frozen per-frame clock
+                prof.begin_frame()
+                with prof.section("input"): self.input.process_events()
+                steps = 0
+                while acc >= dt and steps < MAX_SIM_STEPS:
+                    self.step(dt)
+                    acc -= dt; steps += 1
+                if steps == MAX_SIM_STEPS and acc >= dt:
+                    acc = 0.0  # too far behind: drop the backlog (slow down) rather than spiral
+                if rec: rec.end_frame(self, frame_t, steps)
+                self.alpha = acc / dt
+                if not self.render:
+                    pass
+                elif self.render_skip and steps > 1 and skipped < MAX_RENDER_SKIP:
+                    skipped += 1  # behind schedule: spend this frame on simulation only
+                else:
+                    skipped = 0
+                    with self._interpolated():
+                        self.draw()
+                if first:
+                    self.startup.finish("first frame"); first = False
+                if self.fps_cap:
+                    with prof.section("sleep"): self.clock.tick(self.fps_cap)
+                prof.end_frame()
+        finally:
+            if rec: rec.close(self)  # also on quit (sys.exit) and crashes: keeps the tail replayable
+            prof.stop_csv()  # flush the last profile rows to disk
+
+    def step(self, dt):
+        """One fixed simulation step."""
+        self._prev_hero_pos = (self.hero, self.hero.x, self.hero.y)
+        self.update(dt)
+
+    @contextmanager
+    def _interpolated(self):
+        """Temporarily place the hero at its interpolated render position."""
+        prev = self._prev_hero_pos
+        h = self.hero
+        if prev is None or prev[0] is not h or self.state != "OVERWORLD":
+            yield; return
+        x, y = h.x, h.y
+        px, py = prev[1], prev[2]
+        if abs(x - px) + abs(y - py) > 64:  # teleport (load / restart): don't smear
+            yield; return
+        a = self.alpha
+        h.x = px + (x - px) * a; h.y = py + (y - py) * a
+        try:
+            yield
+        finally:
+            h.x, h.y = x, y
 
     def update(self, dt):
+        SAVER.poll()  # background save completions -> toast
         if self.state == "START":
             ng = self.start_screen.consume_new_game_request()
             if ng is not None:  # CHANGED
@@ -176,14 +309,15 @@ class Game:
                 self.load_save_slot(slot)
             return
 
-        keys = pygame.key.get_pressed()
+        keys = self.input.pressed()
+        sec = self.profiler.section
         if self.battle:
-            self.battle.update(dt)
+            with sec("update.battle"): self.battle.update(dt)
         else:
-            if not self.shop.opened:
-                self.overworld.update(dt, keys)
+            if not self.shop_open:
+                with sec("update.overworld"): self.overworld.update(dt, keys)
                 if keys[pygame.K_RETURN] and self.overworld.near_shop():
-                    if not self.shop.opened:
+                    if not self.shop_open:
                         self.inv_open = True
                         self.inv_ui.reload_from_hero()
                         self.shop.open()
@@ -193,11 +327,15 @@ class Game:
                         self.battle = enc
                         self.battle.log.append("An encounter appears!")
                         win_beep(800, 120)
-        self.ground.update()
-        if (not self.battle) and self.auto_loot and not self.shop.opened and not self.inv_open:
-            for g in self.ground.items[:]:
-                if (g.pos.x-self.hero.x)**2 + (g.pos.y-self.hero.y)**2 <= 110*110:
-                    self._pickup_ground_at((int(g.pos.x), int(g.pos.y)))
+        with sec("update.ground"):
+            self.ground.update()
+            if (not self.battle) and self.auto_loot and not self.shop_open and not self.inv_open:
+                for g in self.ground.query_radius((self.hero.x, self.hero.y), 110):
+                    self._pickup_ground_at((int(g.pos.x), int(g.pos.y)), g)
+        # drop affixed defs nothing holds any more (not mid-battle / mid-drag, where loot or a
+        # dragged stack may be briefly unreferenced)
+        if not (self.battle or self.inv_open or self.shop_open):
+            DYNAMIC_ITEMS.maybe_collect(session.now())
 
         # --- update death state outside battle ---
         if not self.battle and self.state == "OVERWORLD":
@@ -206,43 +344,55 @@ class Game:
             self.hero_dead = False
 
     def draw(self):
+        sec = self.profiler.section
         if self.state == "START":
-            self.start_screen.draw(self.screen)
-            pygame.display.flip()
+            with sec("draw.start"): self.start_screen.draw(self.screen)
+            self.profiler.draw(self.screen)
+            with sec("flip"): pygame.display.flip()
+            self.renderer.invalidate()
+            return
+        if self.renderer.can_handle():
+            with sec("draw.dirty"): self.renderer.draw()
             return
+        self.renderer.invalidate()
         if not self.battle:
-            self.overworld.draw(self.screen)
-            self.ground.draw(self.screen)
-            if self.inv_open: self.inv_ui.draw(self.screen)
-            if self.shop.opened: self.shop.draw(self.screen)
-            if self.char_open: self.char_sheet.draw(self.screen)
-            if self.journal_open: self.journal.draw(self.screen)
-            if self.help_open: self.help.draw(self.screen)
-            if self.talent_open: self.talent.draw(self.screen)
-            if self.tavern_open: self.tavern.draw(self.screen)
-            if self.party_open: self.party_ui.draw(self.screen)
-            self._draw_overworld_stats_hud()
+            with sec("draw.overworld"): self.overworld.draw(self.screen)
+            with sec("draw.ground"): self.ground.draw(self.screen)
+            for name, opened, attr in (("inventory", self.inv_open, "inv_ui"), ("shop", self.shop_open, "shop"),
+                                       ("character", self.char_open, "char_sheet"),
+                                       ("journal", self.journal_open, "journal"), ("help", self.help_open, "help"),
+                                       ("talent", self.talent_open, "talent"), ("tavern", self.tavern_open, "tavern"),
+                                       ("party", self.party_open, "party_ui")):
+                if opened:
+                    with sec("draw." + name): getattr(self, attr).draw(self.screen)
+            with sec("draw.hud"): self._draw_overworld_stats_hud()
             # death overlay (draw after HUD so it sits on top)
             if self.hero_dead:
                 self._draw_death_overlay()
         else:
-            self.battle.draw(self.screen)
-        pygame.display.flip()
+            with sec("draw.battle"): self.battle.draw(self.screen)
+        self.profiler.draw(self.screen)
+        with sec("flip"): pygame.display.flip()
 
-    def _draw_overworld_stats_hud(self):
-        if self.inv_open or self.char_open or self.journal_open or self.shop.opened: return
+    def _hud_lines(self):
+        """HUD text (also used as the dirty-rect key); grows hud_rect to fit."""
         h = self.hero; r = self.hud_rect
         # build first line with hero name
         line1 = f"{h.name} Lv {h.level()}  HP {h.hp}/{h.max_hp()}  MP {h.mp}/{h.max_mp()}"
         needed_w = FONT_BIG.size(line1)[0] + 32
         if needed_w > r.w:
             r.w = min(needed_w, SCREEN_W - 24)   # expand if necessary
+        line2 = f"ATK {h.attack()}  MAG {h.magic()}  DEF {h.defense()}   Gil {h.gil}   [H] Help"
+        return line1, line2
+
+    def _draw_overworld_stats_hud(self):
+        if self.inv_open or self.char_open or self.journal_open or self.shop_open: return
+        r = self.hud_rect
+        line1, line2 = self._hud_lines()
         pygame.draw.rect(self.screen, (24,24,30), r, border_radius=10)
         pygame.draw.rect(self.screen, (60,60,80), r, 2, border_radius=10)
         draw_text(self.screen, line1, r.x + 10, r.y + 8, WHITE, FONT_BIG)
-        draw_text(self.screen,
-                  f"ATK {h.attack()}  MAG {h.magic()}  DEF {h.defense()}   Gil {h.gil}   [H] Help",
-                  r.x + 10, r.y + 30, GOLD, FONT)
+        draw_text(self.screen, line2, r.x + 10, r.y + 30, GOLD, FONT)
 
     def _draw_death_overlay(self):
         """Simple fail state outside battle; lets player revive via potion or reload."""
@@ -261,8 +411,8 @@ class Game:
     # ---------- Input helpers (overworld hotkeys) ----------
     def handle_overworld_input(self, key):
         if key == pygame.K_F5:
-            msg = save_game(self.hero, self.current_save_slot)
-            self.overworld.set_toast(msg); win_beep(900, 90)
+            SAVER.submit(self.hero, self.current_save_slot, self.overworld.set_toast)
+            self.overworld.set_toast("Saving..."); win_beep(900, 90)
         elif key == pygame.K_F9:
             msg = load_game(self.hero, self.current_save_slot)
             self.overworld.set_toast(msg); win_beep(700, 90)
@@ -278,9 +428,7 @@ class Game:
         self.hero = Hero()
         self.party = [self.hero]; self.hero.party = self.party
         self.overworld.hero = self.hero
-        self.inv_ui.hero = self.hero
-        self.char_sheet.hero = self.hero
-        self.journal.hero = self.hero
+        self._rebind_hero()
         self.battle = None
         if hasattr(self.overworld, "set_toast"):
             self.overworld.set_toast("Run restarted.")
@@ -311,11 +459,35 @@ class Game:
             for iid, qty in list(mem.inventory.counts.items()):
                 if qty > 0:
                     leader_inv.add(iid, qty)
-            mem.inventory.counts.clear()
+            mem.inventory.counts = {}
 
 if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--uncapped", action="store_true", help="render as fast as possible (sim stays at SIM_HZ)")
+    ap.add_argument("--render-skip", action="store_true", help="drop frames instead of slowing when behind")
+    ap.add_argument("--record", metavar="PATH", help="record input + RNG seed for `python -m core.replay PATH`")
+    ap.add_argument("--seed", type=int, default=None, help="gameplay RNG seed (default: random)")
+    ap.add_argument("--startup-report", action="store_true", help="print startup phase timings (and lazy overlay builds)")
+    ap.add_argument("--save-format", action="append", default=[], metavar="[SLOT=]FMT",
+                    help="save format (json/binary) for one slot or, without SLOT=, all slots; converts existing saves")
+    args = ap.parse_args()
+    for spec in args.save_format:
+        slot, _, fmt = spec.rpartition("=")
+        try:
+            for s in ([int(slot)] if slot else SAVE_SLOTS): set_slot_format(s, fmt)
+        except ValueError as e:
+            ap.error(f"--save-format {spec}: {e}")
+    seed = args.seed if args.seed is not None else int.from_bytes(os.urandom(4), "little")
+    session.reseed(seed)
+    recorder = None
+    if args.record:
+        from core.replay import Recorder
+        recorder = Recorder(args.record, seed)
     try:
-        Game().run()
+        game = Game(fps_cap=None if args.uncapped else FPS_CAP, render_skip=args.render_skip, input_source=recorder,
+                    startup_report=args.startup_report)
+        game.recorder = recorder
+        game.run()
     except Exception:
         pygame.quit()
         raise
\ No newline at end of file
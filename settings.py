@@ -1,6 +1,5 @@
 import pygame
-
-pygame.font.init()
+from collections import OrderedDict
 
 # ---- Screen / Layout ----
 SCREEN_W, SCREEN_H = 1920, 1080
@@ -8,9 +7,20 @@ HUD_HEIGHT = 64
 LOG_HEIGHT = 112
 PANEL_MARGIN = 40
 
+# ---- Loop timing ----
+SIM_HZ = 60                  # fixed simulation rate (updates/sec)
+FPS_CAP = 60                 # render cap; None = uncapped (interpolated)
+MAX_SIM_STEPS = 5            # per frame; beyond this the game slows instead of spiralling
+MAX_RENDER_SKIP = 3          # render-skip mode: consecutive frames dropped while catching up
+
+# ---- Saves ----
+SAVE_FORMAT = "json"         # format for new slots: "json" (fast) or "binary" (core.savefmt: ~15x smaller, slower)
+
 # ---- Fonts ----
-FONT = pygame.font.SysFont(None, 22)
-FONT_BIG = pygame.font.SysFont(None, 28)
+from ui.fonts import FONTS, LazyFont  # registry: bundled files, cached per size
+
+FONT = LazyFont(22)
+FONT_BIG = LazyFont(28)
 
 # ---- Colors ----
 BLACK = (0, 0, 0); WHITE = (255, 255, 255); GRAY = (60, 60, 60); DARK = (18, 18, 18)
@@ -64,19 +74,107 @@ def clamp(v, lo, hi): return max(lo, min(hi, v))
 def type_multiplier(attacker_type, defender_type):
     return TYPE_CHART.get(attacker_type, {}).get(defender_type, 1.0)
 
+class TextCache:
+    """LRU of rendered text surfaces keyed by (font, text, color)."""
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._surfs = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text, color=WHITE, font=FONT):
+        key = (font, text, tuple(color))
+        img = self._surfs.get(key)
+        if img is not None:
+            self._surfs.move_to_end(key)
+            self.hits += 1
+            return img
+        self.misses += 1
+        img = font.render(text, True, color)
+        self._surfs[key] = img
+        if len(self._surfs) > self.max_entries:
+            self._surfs.popitem(last=False)
+        return img
+
+    def clear(self):
+        self._surfs.clear()
+        self.hits = self.misses = 0
+
+    def stats(self):
+        return {"entries": len(self._surfs), "hits": self.hits, "misses": self.misses}
+
+TEXT_CACHE = TextCache()
+
+def render_text(text, color=WHITE, font=FONT):
+    return TEXT_CACHE.render(str(text), color, font)
+
 def draw_text(surf, text, x, y, color=WHITE, font=FONT):
-    img = font.render(text, True, color); surf.blit(img, (x, y))
+    surf.blit(render_text(text, color, font), (x, y))
+
+class TextMetrics:
+    """
+    Width engine for wrap_text: per-font word (and space) widths are measured once and
+    line widths composed additively to find each line's candidate end. Kerning and SDL_ttf's
+    sub-pixel placement make the sums drift (assumed at most 1px per word boundary), so the
+    candidate is always measured with font.size() and shortened until it really fits: one
+    exact check per line, more only when the drift straddles the limit. Results are
+    memoized by (text, font, width).
+    """
+    def __init__(self, max_words=8192, max_wraps=512):
+        self.max_words = max_words
+        self.max_wraps = max_wraps
+        self._words = {}
+        self._wraps = OrderedDict()
+        self.exact_checks = 0
+
+    def word_width(self, font, word):
+        key = (font, word)
+        w = self._words.get(key)
+        if w is None:
+            if len(self._words) >= self.max_words: self._words.clear()
+            w = self._words[key] = font.size(word)[0]
+        return w
+
+    def wrap(self, text, font, max_width):
+        key = (text, font, max_width)
+        hit = self._wraps.get(key)
+        if hit is not None:
+            self._wraps.move_to_end(key)
+            return list(hit)
+        lines = self._wrap(text, font, max_width)
+        self._wraps[key] = tuple(lines)
+        if len(self._wraps) > self.max_wraps:
+            self._wraps.popitem(last=False)
+        return lines
+
+    def _wrap(self, text, font, max_width):
+        space = self.word_width(font, " ")
+        words = text.split()
+        lines, i = [], 0
+        while i < len(words):
+            # extend by summed widths while within the kerning slack (1px per word boundary)...
+            j, est = i + 1, self.word_width(font, words[i])
+            while j < len(words):
+                test = est + space + self.word_width(font, words[j])
+                if test > max_width + (j - i) + 1: break
+                est = test; j += 1
+            # ...then accept the line only once its rendered width fits, dropping words if not
+            while j > i + 1:
+                self.exact_checks += 1
+                if font.size(" ".join(words[i:j]))[0] <= max_width: break
+                j -= 1
+            lines.append(" ".join(words[i:j]))
+            i = j
+        return lines
+
+    def clear(self):
+        self._words.clear(); self._wraps.clear()
+        self.exact_checks = 0
+
+TEXT_METRICS = TextMetrics()
 
 def wrap_text(text, font, max_width):
-    words, lines, line = text.split(), [], ""
-    for w in words:
-        test = w if not line else f"{line} {w}"
-        if font.size(test)[0] <= max_width: line = test
-        else:
-            if line: lines.append(line)
-            line = w
-    if line: lines.append(line)
-    return lines
+    return TEXT_METRICS.wrap(text, font, max_width)
 
 def win_beep(freq=600, dur=80):
     try:
@@ -0,0 +1,28 @@
+import copy, pickle
+from core.battle import BattleLog
+from core.combat import LOG_LIMIT
+
+def make_log():
+    log = BattleLog(["An encounter appears!"])
+    log.set_width(300)
+    log.extend(f"Hit {i}" for i in range(5))
+    return log
+
+def test_copy_and_pickle_keep_messages():
+    log = make_log()
+    for dup in (copy.copy(log), copy.deepcopy(log), pickle.loads(pickle.dumps(log))):
+        assert type(dup) is BattleLog
+        assert list(dup) == list(log) and dup.messages.maxlen == LOG_LIMIT
+        assert dup.font is log.font and dup._lines.maxlen == log._lines.maxlen
+        dup.append("only in the copy")
+        assert len(dup) == len(log) + 1
+
+def test_copy_rewraps_on_set_width():
+    dup = copy.copy(make_log())
+    assert dup.tail(10) == []
+    dup.set_width(300)
+    assert len(dup.tail(10)) == len(dup)
+
+def test_ring_buffer_limit():
+    log = BattleLog(range(LOG_LIMIT + 5))
+    assert len(log) == LOG_LIMIT and next(iter(log)) == 5
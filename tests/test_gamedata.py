@@ -0,0 +1,20 @@
+import pytest
+from core import gamedata
+
+def test_failed_write_leaves_no_temp_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert gamedata.write_save({"version": gamedata.SAVE_VERSION, "hero_name": "A"}, 1) == "Saved slot 1."
+    before = sorted(p.name for p in tmp_path.iterdir())
+    def boom(*a, **k): raise OSError("disk full")
+    monkeypatch.setattr(gamedata.os, "fsync", boom)
+    with pytest.raises(OSError):
+        gamedata.write_save({"version": gamedata.SAVE_VERSION, "hero_name": "B"}, 1)
+    assert sorted(p.name for p in tmp_path.iterdir()) == before   # old slot kept, no .tmp
+
+def test_save_worker_registers_flush_once(monkeypatch):
+    registered = []
+    monkeypatch.setattr(gamedata.atexit, "register", registered.append)
+    w = gamedata.SaveWorker()
+    for _ in range(3):
+        w._ensure_thread(); w._thread = None   # simulate the thread having died
+    assert registered == [w.flush]
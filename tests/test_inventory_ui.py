@@ -0,0 +1,48 @@
+from core.entities import Hero
+from ui.inventory_ui import InventoryUI
+
+def make_ui(cols=2, rows=1):
+    hero = Hero("FIGHTER", "Test")
+    ui = InventoryUI(hero, cols=cols, rows=rows)
+    dropped, messages = [], []
+    ui.on_drop_to_ground = lambda iid, n: dropped.append((iid, n))
+    ui.on_message = messages.append
+    return hero, ui, dropped, messages
+
+def test_add_to_full_grid_drops_the_excess():
+    hero, ui, dropped, messages = make_ui()
+    hero.inventory.add("WOOD_SWORD", 3)   # unstackable: two slots, one sword left over
+    assert ui.grid.totals == {"WOOD_SWORD": 2}
+    assert hero.inventory.qty("WOOD_SWORD") == 2
+    assert dropped == [("WOOD_SWORD", 1)]
+    assert messages and "full" in messages[0]
+
+def test_full_grid_then_commit_keeps_inventory_in_sync():
+    hero, ui, dropped, _ = make_ui()
+    hero.inventory.add("POTION", 99)
+    hero.inventory.add("ETHER", 150)       # one stack of 99 fits, 51 do not
+    assert dropped == [("ETHER", 51)]
+    ui.grid.remove_item("ETHER", 9)
+    ui.commit_to_hero()
+    assert hero.inventory.counts == {"POTION": 99, "ETHER": 90}
+    assert ui.grid.totals == hero.inventory.counts
+
+def test_full_grid_without_ground_rejects_the_excess():
+    hero, ui, _, messages = make_ui()
+    ui.on_drop_to_ground = None
+    hero.inventory.add("WOOD_SWORD", 2)
+    hero.inventory.add("WOOD_SHIELD", 1)
+    assert hero.inventory.counts == {"WOOD_SWORD": 2}
+    assert ui.grid.totals == hero.inventory.counts
+    assert messages == ["Inventory full! No room for Wood Shield x1."]
+
+def test_hover_follows_recorded_pointer():
+    from core.session import set_mouse_pos
+    hero, ui, _, _ = make_ui()
+    hero.inventory.add("POTION", 3)
+    set_mouse_pos(ui.grid_rect.center)   # pointer as the last input event left it
+    ui._gather_hover()
+    assert ui._hover_item_id is None     # second cell is empty
+    set_mouse_pos((ui.grid_rect.x + 1, ui.grid_rect.y + 1))
+    ui._gather_hover()
+    assert ui._hover_item_id == "POTION"
@@ -0,0 +1,18 @@
+from core.sim import build_party
+from core.loadout import optimize
+from data.inventory import ITEMS, DYNAMIC_ITEMS
+from ui.inventory_ui import InventoryUI
+
+def test_equal_score_item_does_not_displace_worn_gear():
+    party = build_party(["FIGHTER", "BLACK_MAGE"], level=5)   # class starter kits equipped
+    hero = party[0]
+    worn = hero.equipment["weapon"]
+    assert worn
+    twin = f"{worn}#~TWIN"   # same stats, sorts after the worn id
+    if twin not in ITEMS:
+        DYNAMIC_ITEMS.register(ITEMS[worn].clone_with(twin, "Twin", {}, 1.0, "COMMON"))
+    hero.inventory.add(twin, 1)
+    assert optimize(party, hero.inventory.counts).changes(party) == []
+    ui = InventoryUI(hero)
+    assert ui.auto_equip() == "Gear is already optimal."
+    assert hero.equipment["weapon"] == worn and hero.inventory.qty(twin) == 1
@@ -0,0 +1,29 @@
+import pytest
+from settings import FONT, FONT_BIG, TextMetrics
+from ui.help_overlay import HELP_LINES
+from core.wrap_reference import wrap_text_naive
+
+TEXTS = [ln for ln in HELP_LINES if ln and not ln.endswith(":")] + [
+    "AVAWAY To Ty WAVY LT Yo VA AV", "Wo Ty Te Ta We Yo Vo Av AT AY"]  # kerning-heavy pairs
+
+@pytest.mark.parametrize("font", [FONT, FONT_BIG], ids=["FONT", "FONT_BIG"])
+def test_matches_naive_with_real_font(font):
+    tm = TextMetrics()
+    for width in range(60, 900, 7):
+        for text in TEXTS:
+            lines = tm._wrap(text, font, width)
+            assert lines == wrap_text_naive(text, font, width), (text, width)
+            assert all(font.size(ln)[0] <= width for ln in lines if " " in ln)
+
+class DriftFont:
+    """Joined text renders 4px wider per space than its words summed (beyond the 1px slack)."""
+    def size(self, s):
+        gap = 7 if s.strip() else 3  # a lone space measures 3, a space between words 7
+        return (10 * len(s.replace(" ", "")) + gap * s.count(" "), 12)
+
+def test_measures_candidate_when_sums_underestimate():
+    font, tm = DriftFont(), TextMetrics()
+    text = "aa bb cc dd ee ff gg hh"
+    for width in range(20, 200, 3):
+        assert tm._wrap(text, font, width) == wrap_text_naive(text, font, width), width
+    assert tm.exact_checks
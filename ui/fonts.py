@@ -0,0 +1,77 @@
+"""
+Font registry: every Font the game uses comes from here, loaded straight from a file
+(never pygame.font.SysFont, whose system font scan runs fc-list and can take a long time on
+machines with many fonts) and cached per (face, size).
+
+A face resolves to assets/fonts/<face>.ttf|.otf when that file exists, else to the font
+bundled inside pygame (freesansbold.ttf, opened as Font(None, size), which also applies
+pygame's default-font size scaling). That is what SysFont(None) ended up loading, so text
+renders exactly as before.
+"""
+import os
+import pygame
+
+FONT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "fonts")
+DEFAULT_FACE = "regular"
+_EXTS = (".ttf", ".otf")
+
+class FontRegistry:
+    def __init__(self, font_dir=FONT_DIR):
+        self.font_dir = font_dir
+        self._paths: dict = {}   # face -> font file (None: pygame's bundled default)
+        self._fonts: dict = {}   # (face, size) -> pygame.font.Font
+        self.loads = 0
+
+    def register(self, face, path):
+        """Point a face at a specific file (drops fonts already loaded for it)."""
+        self._paths[face] = path
+        for key in [k for k in self._fonts if k[0] == face]: del self._fonts[key]
+
+    def path(self, face=DEFAULT_FACE):
+        if face not in self._paths:
+            self._paths[face] = next((c for c in (os.path.join(self.font_dir, face + e) for e in _EXTS)
+                                      if os.path.exists(c)), None)
+        return self._paths[face]
+
+    def get(self, size, face=DEFAULT_FACE) -> pygame.font.Font:
+        key = (face, size)
+        f = self._fonts.get(key)
+        if f is None:
+            if not pygame.font.get_init(): pygame.font.init()
+            f = self._fonts[key] = pygame.font.Font(self.path(face), size)
+            self.loads += 1
+        return f
+
+    def stats(self):
+        return {"fonts": len(self._fonts), "loads": self.loads,
+                "faces": {face: os.path.basename(p) if p else pygame.font.get_default_font()
+                          for face, p in self._paths.items()}}
+
+FONTS = FontRegistry()
+
+def font(size, face=DEFAULT_FACE) -> pygame.font.Font:
+    return FONTS.get(size, face)
+
+class LazyFont:
+    """
+    Stand-in for a registry Font that is only loaded on first use, so importing settings
+    stays cheap for headless tools. Each font method is bound onto the proxy the first
+    time it is used, so later calls cost the same as on the real Font.
+    """
+    def __init__(self, size, face=DEFAULT_FACE):
+        self._size = size; self._face = face
+        self._font = None
+
+    def resolve(self) -> pygame.font.Font:
+        if self._font is None:
+            self._font = FONTS.get(self._size, self._face)
+        return self._font
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"): raise AttributeError(attr)
+        val = getattr(self.resolve(), attr)
+        if callable(val): setattr(self, attr, val)
+        return val
+
+    def __repr__(self):
+        return f"LazyFont({self._size}, {self._face!r}{'' if self._font else ', unresolved'})"
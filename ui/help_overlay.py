@@ -19,6 +19,7 @@ HELP_LINES = [
     "General:",
     "  Auto-Loot picks items in radius periodically.",
     "  Double-click inventory equipment to equip; double-click equipped slot to unequip.",
+    "  O (in Inventory): equip the party's best gear from the bag.",
     "  Drag items to shop to sell; drag from shop to buy.",
     "",
     "  T Talent Panel (spend points on attributes / masteries)",
@@ -27,6 +28,7 @@ HELP_LINES = [
     "Thief: Steal command in battle (chance for extra item).",
     "",
     "  M Party Management (rename, reorder, dismiss)",
+    "  F3 Frame Profiler   F4 Record Frame Profile (CSV)",
     "",
     "Press H or ESC to close."
 ]
@@ -0,0 +1,87 @@
+# icon_atlas.py
+import pygame as pg
+from collections import OrderedDict
+from typing import Dict, Optional
+from settings import draw_text, WHITE
+from data.inventory import ITEMS, ITEM_INDEX
+from ui.ui_common import CELL
+
+KIND_COLORS = {
+    "consumable": (170, 60, 60),
+    "spell_tome": (120, 70, 150),
+    "equipment": (170, 140, 60),
+}
+
+def _bake(cell: pg.Surface, item_id: str):
+    """Placeholder icon: colored square with 2-letter tag (kind + first letters)."""
+    idef = ITEMS[item_id]
+    cell.fill(KIND_COLORS.get(idef.kind, (90, 120, 180)))
+    pg.draw.rect(cell, (0,0,0), cell.get_rect(), 2, border_radius=6)
+    draw_text(cell, idef.name[:2].upper(), 8, 6, WHITE)
+
+class IconAtlas:
+    """
+    Single texture sheet of CELL-sized item icons, handed out as subsurfaces.
+      - Static ITEMS get fixed cells, baked once when the sheet is built.
+      - Dynamic (affixed) ids share a bounded pool of cells with LRU eviction.
+    """
+    def __init__(self, cols: int = 16, dynamic_cells: int = 128):
+        self.cols = cols
+        self.dynamic_cells = dynamic_cells
+        self.sheet: Optional[pg.Surface] = None
+        self._static: Dict[str, pg.Surface] = {}
+        self._dynamic: "OrderedDict[str, pg.Surface]" = OrderedDict()
+        self._free: list[pg.Surface] = []
+        self.evictions = 0
+
+    def _cell(self, index: int) -> pg.Surface:
+        assert self.sheet is not None
+        c, r = index % self.cols, index // self.cols
+        return self.sheet.subsurface(pg.Rect(c*CELL, r*CELL, CELL, CELL))
+
+    def build(self):
+        """(Re)bake the sheet: every static item, then currently registered dynamic ids."""
+        static_ids = ITEM_INDEX.static_ids()
+        total = len(static_ids) + self.dynamic_cells
+        rows = (total + self.cols - 1) // self.cols
+        self.sheet = pg.Surface((self.cols*CELL, rows*CELL), pg.SRCALPHA)
+        self._static = {}
+        for i, iid in enumerate(static_ids):
+            cell = self._cell(i)
+            _bake(cell, iid)
+            self._static[iid] = cell
+        self._dynamic = OrderedDict()
+        self._free = [self._cell(len(static_ids) + i) for i in range(self.dynamic_cells)]
+        self._free.reverse()  # pop() hands out cells in sheet order
+        for iid in ITEM_INDEX.dynamic_ids():
+            if not self._free: break
+            self.get(iid)
+
+    def get(self, item_id: str) -> pg.Surface:
+        if self.sheet is None:
+            self.build()
+        cell = self._static.get(item_id)
+        if cell is not None:
+            return cell
+        cell = self._dynamic.get(item_id)
+        if cell is not None:
+            self._dynamic.move_to_end(item_id)
+            return cell
+        # Not baked yet: take a free dynamic cell or recycle the least recently used one
+        if self._free:
+            cell = self._free.pop()
+        else:
+            _, cell = self._dynamic.popitem(last=False)
+            self.evictions += 1
+        _bake(cell, item_id)
+        self._dynamic[item_id] = cell
+        return cell
+
+    def stats(self):
+        return {"static": len(self._static), "dynamic": len(self._dynamic),
+                "free": len(self._free), "evictions": self.evictions}
+
+ICONS = IconAtlas()
+
+def icon_for(item_id: str) -> pg.Surface:
+    return ICONS.get(item_id)
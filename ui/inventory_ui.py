@@ -2,9 +2,13 @@
 import pygame as pg
 from typing import Optional, Tuple, Dict, List, Callable, Any
 from ui.ui_common import CELL, PAD, draw_panel, Draggable
-from settings import WHITE, SILVER, BLACK, draw_text, GOLD, FONT, FONT_BIG
-from data.inventory import ITEMS, EQUIP_SLOTS, use_item
-import time
+from settings import WHITE, SILVER, BLACK, GREEN, RED, draw_text, GOLD, FONT, FONT_BIG
+from data.inventory import ITEMS, EQUIP_SLOTS, use_item, ATTACK, MAGIC, DEFENSE, AGILITY
+from core.party_stats import PARTY_STATS, equip_target_slot
+from core.loadout import optimize
+from ui.icon_atlas import icon_for
+import heapq
+from core.session import now as session_now, mouse_pos
 
 Vec2 = Tuple[int,int]
 
@@ -16,9 +20,7 @@ def _max_stack(item_id: str) -> int:
     return 99 if _stackable(item_id) else 1
 
 def _icon(item_id: str) -> pg.Surface:
-    # Lazy icon similar to ground
-    from world.ground import _icon_for
-    return _icon_for(item_id)
+    return icon_for(item_id)
 
 class Slot:
     def __init__(self):
@@ -29,45 +31,131 @@ class Slot:
         return not self.id
 
 class GridInventoryUI:
-    """Grid presentation separate from the dict-based Inventory."""
+    """
+    Grid presentation separate from the dict-based Inventory.
+    Indexed so add/remove stay O(log n): a min-heap of free slots, per-item min-heaps of
+    partially filled stacks (stale entries dropped when they reach the top), running
+    per-item totals, and the item ids touched since the last commit.
+    All slot writes go through _set().
+    """
     def __init__(self, cols: int, rows: int):
         self.cols = cols
         self.rows = rows
         self.slots: List[Slot] = [Slot() for _ in range(cols*rows)]
+        self._free: List[int] = list(range(cols*rows))   # sorted == valid heap
+        self._free_set = set(self._free)
+        self._partial: Dict[str, List[int]] = {}
+        self._partial_of: Dict[int, str] = {}   # slot -> item heap it is queued in
+        self._slots_of: Dict[str, set] = {}     # item -> occupied slots
+        self.free_count = cols*rows
+        self.totals: Dict[str,int] = {}
+        self.dirty: set = set()
+        self.rev = 0   # bumped on every content change
+
+    def _bump(self, item_id: str, delta: int):
+        self.rev += 1
+        n = self.totals.get(item_id, 0) + delta
+        if n > 0: self.totals[item_id] = n
+        else: self.totals.pop(item_id, None)
+        self.dirty.add(item_id)
+
+    def _set(self, idx: int, item_id: Optional[str], count: int):
+        s = self.slots[idx]
+        if s.id:
+            self._bump(s.id, -s.count)
+            held = self._slots_of[s.id]; held.discard(idx)
+            if not held: del self._slots_of[s.id]
+        else:
+            self.free_count -= 1
+        if not item_id or count <= 0:
+            item_id, count = None, 0
+        s.id = item_id; s.count = count
+        if item_id is None:
+            self.free_count += 1
+            if idx not in self._free_set:
+                self._free_set.add(idx); heapq.heappush(self._free, idx)
+            return
+        self._bump(item_id, count)
+        self._slots_of.setdefault(item_id, set()).add(idx)
+        if count < _max_stack(item_id) and self._partial_of.get(idx) != item_id:
+            self._partial_of[idx] = item_id
+            heapq.heappush(self._partial.setdefault(item_id, []), idx)
 
     def first_empty(self) -> Optional[int]:
-        for i,s in enumerate(self.slots):
-            if s.is_empty():
-                return i
+        free = self._free
+        while free:
+            if self.slots[free[0]].is_empty(): return free[0]
+            self._free_set.discard(heapq.heappop(free))
+        return None
+
+    def _first_partial(self, item_id: str) -> Optional[int]:
+        h = self._partial.get(item_id)
+        while h:
+            s = self.slots[h[0]]
+            if s.id == item_id and s.count < _max_stack(item_id): return h[0]
+            idx = heapq.heappop(h)
+            if self._partial_of.get(idx) == item_id: del self._partial_of[idx]
+        if h is not None: del self._partial[item_id]
         return None
 
     def add_stack(self, item_id: str, qty: int) -> bool:
-        # try stack onto existing
-        if _stackable(item_id):
-            for s in self.slots:
-                if s.id == item_id and s.count < _max_stack(item_id):
-                    room = _max_stack(item_id) - s.count
-                    take = min(room, qty)
-                    s.count += take
-                    qty -= take
-                    if qty == 0: return True
+        mx = _max_stack(item_id)
+        # try stack onto existing (lowest slot first)
+        if mx > 1:
+            while qty > 0:
+                idx = self._first_partial(item_id)
+                if idx is None: break
+                s = self.slots[idx]
+                take = min(mx - s.count, qty)
+                self._set(idx, item_id, s.count + take)
+                qty -= take
         # fill empty slots
         while qty > 0:
             idx = self.first_empty()
             if idx is None: return False
-            s = self.slots[idx]
-            s.id = item_id
-            take = min(_max_stack(item_id), qty)
-            s.count = take
+            take = min(mx, qty)
+            self._set(idx, item_id, take)
             qty -= take
         return True
 
+    def fits(self, item_id: str, qty: int) -> bool:
+        mx = _max_stack(item_id)
+        room = self.free_count * mx
+        if mx > 1:
+            room += sum(mx - self.slots[i].count for i in self._slots_of.get(item_id, ()))
+        return room >= qty
+
+    def remove_item(self, item_id: str, qty: int) -> int:
+        """Take qty of an item from its highest slots first; returns how many were removed."""
+        removed = 0
+        for idx in sorted(self._slots_of.get(item_id, ()), reverse=True):
+            if removed >= qty: break
+            s = self.slots[idx]
+            take = min(s.count, qty - removed)
+            self._set(idx, item_id, s.count - take)
+            removed += take
+        return removed
+
+    def take_slot(self, idx: int) -> Optional[Tuple[str,int]]:
+        """Lift the whole stack out of a slot."""
+        s = self.slots[idx]
+        if s.is_empty(): return None
+        got = (s.id, s.count)
+        self._set(idx, None, 0)
+        return got
+
+    def remove_from_slot(self, idx: int, qty: int = 1):
+        s = self.slots[idx]
+        if s.id: self._set(idx, s.id, s.count - qty)
+
+    def load(self, counts: Dict[str,int]):
+        """Fill from inventory counts; the grid then mirrors them (nothing dirty)."""
+        for item_id, qty in counts.items():
+            self.add_stack(item_id, qty)
+        self.dirty.clear()
+
     def compact_counts(self) -> Dict[str,int]:
-        counts: Dict[str,int] = {}
-        for s in self.slots:
-            if s.id:
-                counts[s.id] = counts.get(s.id, 0) + s.count
-        return counts
+        return dict(self.totals)
 
 class InventoryUI:
     """
@@ -94,6 +182,8 @@ class InventoryUI:
 
         self.drag = Draggable()
         self.open = False
+        self._bound = None      # Inventory the grid mirrors (observed)
+        self._muted = False     # ignore our own writes while committing
 
         # Double-click tracking
         self._last_click_time = 0.0
@@ -108,6 +198,11 @@ class InventoryUI:
         self.is_over_shop: Optional[Callable[[Tuple[int,int]], bool]] = None
         self.on_sell: Optional[Callable[[str,int], None]] = None
         self.on_drop_to_ground: Optional[Callable[[str,int], None]] = None
+        self.on_message: Optional[Callable[[str], None]] = None
+
+        # Best loadout for the current bag + party gear (see core.loadout)
+        self._loadout = None
+        self._loadout_key = None
 
         self.reload_from_hero()
         # (removed previous un-annotated assignments)
@@ -154,13 +249,58 @@ class InventoryUI:
 
     # ----- sync -----
     def reload_from_hero(self):
-        # fill grid from counts
+        """Bind to the hero's inventory; the grid is only rebuilt when that inventory changes
+        identity or is replaced wholesale, otherwise deltas keep it in sync."""
+        inv = self.hero.inventory
+        if inv is self._bound: return
+        if self._bound is not None: self._bound.unsubscribe(self._on_inventory_change)
+        self._bound = inv
+        inv.subscribe(self._on_inventory_change)
+        self._rebuild_grid()
+
+    def _rebuild_grid(self):
         self.grid = GridInventoryUI(self.grid.cols, self.grid.rows)
-        for item_id, qty in self.hero.inventory.counts.items():
-            self.grid.add_stack(item_id, qty)
+        self.grid.load(self._bound.counts)
+
+    def _on_inventory_change(self, item_id: Optional[str], delta: int):
+        if self._muted: return
+        if item_id is None:
+            self._rebuild_grid()
+            return
+        if delta > 0:
+            before = self.grid.totals.get(item_id, 0)
+            if not self.grid.add_stack(item_id, delta):
+                self._overflow(item_id, delta - (self.grid.totals.get(item_id, 0) - before))
+        elif delta < 0: self.grid.remove_item(item_id, -delta)
+        self.grid.dirty.discard(item_id)  # grid already matches the inventory for this id
+
+    def _overflow(self, item_id: str, qty: int):
+        """Grid full: take back the part of an inventory add that found no slot, so the inventory
+        keeps matching the grid (a later commit would otherwise overwrite it), and drop it on
+        the ground (rejected outright when there is no ground handler)."""
+        self._muted = True
+        try:
+            self._bound.take(item_id, qty)
+        finally:
+            self._muted = False
+        name = ITEMS[item_id].name
+        if self.on_drop_to_ground:
+            self.on_drop_to_ground(item_id, qty)
+            msg = f"Inventory full! Dropped {name} x{qty}."
+        else:
+            msg = f"Inventory full! No room for {name} x{qty}."
+        if self.on_message: self.on_message(msg)
 
     def commit_to_hero(self):
-        self.hero.inventory.counts = self.grid.compact_counts()
+        # only items whose grid totals changed since the last commit/reload
+        inv, totals = self.hero.inventory, self.grid.totals
+        self._muted = True
+        try:
+            for item_id in self.grid.dirty:
+                inv.set_qty(item_id, totals.get(item_id, 0))
+        finally:
+            self._muted = False
+        self.grid.dirty.clear()
         # equipment already applied directly as we mutate hero.equipment
 
     # ----- hit tests -----
@@ -192,13 +332,11 @@ class InventoryUI:
     # ----- drag helpers -----
     def _begin_drag_from_grid(self, c: int, r: int, mouse: Vec2):
         idx = r*self.grid.cols + c
-        s = self.grid.slots[idx]
-        if s.is_empty(): return
+        got = self.grid.take_slot(idx)  # lift whole stack
+        if not got: return
+        item_id, count = got
         rect = pg.Rect(self.grid_rect.x + c*CELL, self.grid_rect.y + r*CELL, CELL, CELL)
-        if s.id is not None:
-            self.drag.begin({"src":"grid","c":c,"r":r,"id":s.id,"count":s.count,"rect":rect,"icon":_icon(s.id)}, mouse)
-            # remove from slot (lift whole stack)
-            s.id = None; s.count = 0
+        self.drag.begin({"src":"grid","c":c,"r":r,"id":item_id,"count":count,"rect":rect,"icon":_icon(item_id)}, mouse)
 
     def _begin_drag_from_equip(self, member_index: int, slot_index: int, erect: pg.Rect, mouse: Vec2):
         party = getattr(self.hero, "party", [self.hero])
@@ -289,39 +427,64 @@ class InventoryUI:
         target_member = party[self.selected_member_index] if party else self.hero
 
         if idef.kind == "consumable" or idef.kind == "spell_tome":
-            msg = use_item(target_member, item_id)
+            self._muted = True  # take from the clicked slot below, not via the delta
+            try:
+                msg = use_item(target_member, item_id)
+            finally:
+                self._muted = False
             # Remove one unit if used/learned
             if msg.startswith("Used") or msg.startswith("Learned"):
-                slot.count -= 1
-                if slot.count <= 0:
-                    slot.id = None
+                self.grid.remove_from_slot(idx)
             self.commit_to_hero()
             return
 
         if idef.kind == "equipment" and idef.slot:
-            # Equip to selected member if slot matches
-            target_slot = idef.slot
+            # Equip to selected member (thief: second weapon goes to the offhand/shield slot)
+            target_slot = equip_target_slot(target_member, idef)
             prev = target_member.equipment.get(target_slot)
-            # NEW dual wield logic:
-            # If weapon and primary weapon occupied, thief can use shield slot as offhand.
-            if (idef.slot == "weapon"
-                and prev
-                and target_member.hero_class == "THIEF"):
-                off_prev = target_member.equipment.get("shield")
-                # allow if shield slot empty OR currently holds a non-weapon (any item) -> we replace it
-                if off_prev is None or ITEMS[off_prev].slot != "weapon":
-                    target_slot = "shield"
-                    prev = off_prev
             target_member.equipment[target_slot] = item_id
             # Remove equipped piece from inventory
-            slot.count -= 1
-            if slot.count <= 0:
-                slot.id = None
+            self.grid.remove_from_slot(idx)
             # Return previous gear (if any) to inventory
             if prev:
                 self.grid.add_stack(prev, 1)
             self.commit_to_hero()
 
+    # --- loadout optimizer ---
+    def best_loadout(self):
+        """Optimal gear for the party from the grid + what they wear; cached until either changes."""
+        party = getattr(self.hero, "party", [self.hero])
+        key = (id(self.grid), self.grid.rev, tuple((id(m), m.gear_rev) for m in party))
+        if key != self._loadout_key:
+            self._loadout = optimize(party, self.grid.totals)
+            self._loadout_key = key
+        return self._loadout
+
+    def auto_equip(self) -> str:
+        """Equip the best loadout (O key); swapped-out gear goes back to the grid."""
+        party = getattr(self.hero, "party", [self.hero])
+        changes = self.best_loadout().changes(party)
+        if not changes: return "Gear is already optimal."
+        delta: Dict[str, int] = {}   # grid quantity change per item
+        for _, _, old, new in changes:
+            if old: delta[old] = delta.get(old, 0) + 1
+            if new: delta[new] = delta.get(new, 0) - 1
+        for iid, d in delta.items():
+            if d < 0: self.grid.remove_item(iid, -d)
+        added = []
+        for iid, d in delta.items():
+            if d > 0:
+                if not self.grid.fits(iid, d) or not self.grid.add_stack(iid, d):
+                    for a, n in added: self.grid.remove_item(a, n)       # roll back
+                    for r, n in delta.items():
+                        if n < 0: self.grid.add_stack(r, -n)
+                    return "No room in the bag to swap gear."
+                added.append((iid, d))
+        for mi, slot, _, new in changes:
+            party[mi].equipment[slot] = new
+        self.commit_to_hero()
+        return f"Equipped best gear ({len(changes)} change{'s' if len(changes) != 1 else ''})."
+
     # --- NEW: tooltip helper ---
     def _build_tooltip_lines(self, item_id: str) -> List[str]:
         """Minimal info: name, stats, desc, value."""
@@ -337,6 +500,12 @@ class InventoryUI:
                         stat_parts.append(f"{k[:3].upper()}{v:+d}")
                 if stat_parts:
                     lines.append(" ".join(stat_parts))
+            party = getattr(self.hero, "party", [self.hero])
+            place = self.best_loadout().placement(item_id)
+            if place and place[0] < len(party):
+                member, slot = party[place[0]], place[1]
+                label = "Offhand" if member.hero_class == "THIEF" and slot == "shield" else slot.capitalize()
+                lines.append(f"Best on {member.name} ({label})  [O: equip best]")
         if idef.desc:
             lines.append(idef.desc)
         if idef.kind == "spell_tome" and idef.unlock_spell:
@@ -366,7 +535,7 @@ class InventoryUI:
 
     # ----- events & draw -----
     def handle_event(self, ev: pg.event.Event):
-        mouse = pg.mouse.get_pos()
+        mouse = getattr(ev, "pos", None) or mouse_pos()
         self._hover_item_id = None; self._hover_rect = None
         if ev.type == pg.MOUSEBUTTONDOWN and ev.button == 1:
             slot = self._grid_slot_at(mouse)
@@ -374,7 +543,7 @@ class InventoryUI:
                 # ...existing grid double-click logic unchanged...
                 c, r = slot
                 idx = r*self.grid.cols + c
-                now = time.time()
+                now = session_now()
                 if self._last_click_slot == idx and (now - self._last_click_time) <= self._double_click_interval:
                     self._try_use_slot_item(idx)
                     self._last_click_slot = None
@@ -402,6 +571,9 @@ class InventoryUI:
                 self._cancel_drag()
                 return
             self.open = False
+        elif ev.type == pg.KEYDOWN and ev.key == pg.K_o and not self.drag.payload:
+            msg = self.auto_equip()
+            if self.on_message: self.on_message(msg)
         elif ev.type == pg.KEYDOWN and ev.key in (pg.K_TAB,):
             # Cycle selected member
             party = getattr(self.hero, "party", [self.hero])
@@ -412,7 +584,7 @@ class InventoryUI:
     def _gather_hover(self):
         # Limit to one target per frame.
         if self.drag.payload: return
-        mouse = pg.mouse.get_pos()
+        mouse = mouse_pos()
         gs = self._grid_slot_at(mouse)
         if gs:
             c, r = gs
@@ -438,24 +610,25 @@ class InventoryUI:
         if not party: return
         if self.selected_member_index >= len(party):
             self.selected_member_index = 0
-        h = party[self.selected_member_index]
+        i = self.selected_member_index
+        h = party[i]
+        # Whole party in one batched pass; hovered gear gives the compare delta
+        sheet = PARTY_STATS.sheet(party, self._hover_item_id)
 
         # Collect lines first for dynamic sizing
         lines = []
         lines.append(("title", f"Stats: {h.name}"))
         # (Hint removed from here; placed in footer instead)
 
-        def fmt(label, base, total):
-            gear = total - base
+        def fmt(label, stat):
+            base, gear, total = sheet.base_value(i, stat), sheet.gear_bonus(i, stat), sheet.total(i, stat)
             return f"{label}: {total} ({base}{'+'+str(gear) if gear>0 else ''})"
-        lines.append(("stat", fmt("ATK", h.base_attack, h.attack())))
-        lines.append(("stat", fmt("MAG", h.base_magic, h.magic())))
-        lines.append(("stat", fmt("DEF", h.base_defense, h.defense())))
-        lines.append(("stat", fmt("AGI", h.base_agility, h.agility())))
+        for label, stat in (("ATK", ATTACK), ("MAG", MAGIC), ("DEF", DEFENSE), ("AGI", AGILITY)):
+            lines.append(("stat", fmt(label, stat), sheet.change(i, stat)))
 
         # Resist lines
         res_labels = ["FIRE","ICE","ELECTRIC","POISON"]
-        resist_vals = [(r, h.resistance(r)) for r in res_labels if h.resistance(r)]
+        resist_vals = [(r, v) for r, v in ((r, sheet.resist(i, r)) for r in res_labels) if v]
         if resist_vals:
             lines.append(("heading", "Resists:"))
             for r, v in resist_vals:
@@ -471,7 +644,7 @@ class InventoryUI:
         line_gap = 18
         title_extra = 8
         height = pad_y  # top pad
-        for kind, _ in lines:
+        for kind, *_ in lines:
             if kind == "title":
                 height += 26
             else:
@@ -485,7 +658,7 @@ class InventoryUI:
 
         x = panel_rect.x + pad_x
         y = panel_rect.y + pad_y
-        for kind, text in lines:
+        for kind, text, *delta in lines:
             if kind == "title":
                 draw_text(surf, text, x, y, GOLD); y += 26
             elif kind == "heading":
@@ -493,7 +666,10 @@ class InventoryUI:
             elif kind == "tp":
                 draw_text(surf, text, x, y, GOLD); y += line_gap
             else:
-                draw_text(surf, text, x, y, WHITE); y += line_gap
+                draw_text(surf, text, x, y, WHITE)
+                if delta and delta[0]:  # hover-compare
+                    draw_text(surf, f"{delta[0]:+d}", x + FONT.size(text)[0] + 8, y, GREEN if delta[0] > 0 else RED)
+                y += line_gap
 
     # ----- draw with multiple paper dolls -----
     def draw(self, surf: pg.Surface):
@@ -558,6 +734,6 @@ class InventoryUI:
                       self.rect.x + 14, self.footer_y + 18 + 20, SILVER)
 
         # Drag payload
-        self.drag.draw(surf, pg.mouse.get_pos())
+        self.drag.draw(surf, mouse_pos())
         # Tooltip
         self._draw_tooltip(surf)
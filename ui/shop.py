@@ -1,12 +1,12 @@
 # shop.py
 import pygame as pg
-import random, time
+from core.session import RNG, now
 from settings import GOLD, WHITE, SILVER, draw_text
 from ui.shop_ui import ShopUI
-from data.inventory import ITEMS, item_price
+from data.inventory import ITEM_INDEX, item_price
 
 def _today():
-    return int(time.time() // 86400)
+    return int(now() // 86400)
 
 class Shop:
     """
@@ -28,28 +28,26 @@ class Shop:
     # -------- stock rolling --------
     def _roll_stock(self):
         cap = self.ui.cols * self.ui.rows  # 10
-        # Build category pools
-        consumables = [i for i, d in ITEMS.items() if d.kind == "consumable"]
-        tomes       = [i for i, d in ITEMS.items() if d.kind == "spell_tome"]
-        gear        = [i for i, d in ITEMS.items() if d.kind == "equipment" and not getattr(d, "dynamic", False)]
-        rng = random.Random(time.time())
-        rng.shuffle(consumables); rng.shuffle(tomes); rng.shuffle(gear)
+        # Category pools: cached tuples from the item index (no scan of ITEMS, no copies)
+        pools = (ITEM_INDEX.by_kind("consumable"), ITEM_INDEX.by_kind("spell_tome"),
+                 ITEM_INDEX.by_kind("equipment", dynamic=False))
+        rng = RNG
         stock: list[str] = []
-        # Baseline targets (adjust if pools small)
-        def take(src, n):
-            for iid in src[:n]:
+        # Baseline targets (adjust if pools small); pools are disjoint, so no dupes here
+        for pool, n in zip(pools, (3, 2, 5)):
+            stock += rng.sample(pool, min(n, len(pool)))
+        # Fill remainder from the mixed pool: sample positions across all pools without joining
+        # them (cap draws always suffice: at most len(stock) of them can repeat)
+        total = sum(map(len, pools))
+        if len(stock) < min(cap, total):
+            for k in rng.sample(range(total), min(total, cap)):
+                for pool in pools:
+                    if k < len(pool): break
+                    k -= len(pool)
+                iid = pool[k]
                 if iid not in stock:
                     stock.append(iid)
-        take(consumables, min(3, len(consumables)))
-        take(tomes, min(2, len(tomes)))
-        take(gear, min(5, len(gear)))
-        # Fill remainder with mixed pool
-        mixed = consumables + tomes + gear
-        rng.shuffle(mixed)
-        for iid in mixed:
-            if len(stock) >= cap: break
-            if iid not in stock:
-                stock.append(iid)
+                    if len(stock) >= cap: break
         stock = stock[:cap]
         self.ui.set_stock(stock)
         self._last_roll_day = _today()
@@ -3,26 +3,9 @@ import pygame as pg
 from typing import List, Optional, Tuple
 from ui.ui_common import CELL, PAD, draw_panel, Draggable
 from settings import BLACK, SILVER, GOLD, WHITE, draw_text, FONT, FONT_BIG
-from data.inventory import ITEMS, item_price
-
-_icon_cache: dict[str, pg.Surface] = {}
-try:
-    from world.ground import _icon_for
-except ModuleNotFoundError:
-    _icon_for = None
-
-def _make_fallback_icon(item_id: str) -> pg.Surface:
-    s = pg.Surface((CELL, CELL), pg.SRCALPHA)
-    kind = ITEMS[item_id].kind
-    color = {
-        "consumable": (170, 60, 60),
-        "spell_tome": (120, 70, 150),
-        "equipment": (170, 140, 60),
-    }.get(kind, (90, 120, 180))
-    s.fill(color)
-    pg.draw.rect(s, (0,0,0), s.get_rect(), 2, border_radius=6)
-    draw_text(s, ITEMS[item_id].name[:2].upper(), 8, 6, WHITE)
-    return s
+from data.inventory import ITEMS, DYNAMIC_ITEMS, item_price
+from ui.icon_atlas import icon_for
+from core.session import mouse_pos
 
 Vec2 = Tuple[int,int]
 
@@ -40,6 +23,7 @@ class ShopUI:
         self.grid_rect = pg.Rect(self.rect.x + PAD, self.rect.y + PAD + 20, CELL*cols, CELL*rows)
         self.title = title
         self.stock: List[str] = []   # list of item_ids (infinite stock by default)
+        self._refs = DYNAMIC_ITEMS.holder(self)
         self.drag = Draggable()
         self.opened = False
         # gold handlers
@@ -52,6 +36,7 @@ class ShopUI:
 
     def set_stock(self, item_ids: List[str]):
         self.stock = item_ids[:self.cols*self.rows]
+        self._refs.reset(self.stock)
 
     def open(self): self.opened = True
     def close(self): self.opened = False
@@ -103,18 +88,11 @@ class ShopUI:
         return self.rect.collidepoint(mouse)
 
     def _icon(self, item_id: str) -> pg.Surface:
-        surf = _icon_cache.get(item_id)
-        if surf: return surf
-        if _icon_for:
-            surf = _icon_for(item_id)
-        else:
-            surf = _make_fallback_icon(item_id)
-        _icon_cache[item_id] = surf
-        return surf
+        return icon_for(item_id)
 
     def handle_event(self, ev: pg.event.Event):
         if not self.opened: return
-        mouse = pg.mouse.get_pos()
+        mouse = getattr(ev, "pos", None) or mouse_pos()
         if ev.type == pg.MOUSEBUTTONDOWN and ev.button == 1:
             s = self._slot_at(mouse)
             if s:
@@ -142,7 +120,7 @@ class ShopUI:
         draw_panel(surf, self.rect, self.title)
         draw_text(surf, f"Gold: {self.get_gold()}", self.rect.x + 10, self.rect.y + 2, GOLD)
         hover_item = None
-        mouse = pg.mouse.get_pos()
+        mouse = mouse_pos()
         hover_slot = self._slot_at(mouse)
         for r in range(self.rows):
             for c in range(self.cols):
@@ -158,7 +136,7 @@ class ShopUI:
                     iid = self.stock[idx]
                     surf.blit(self._icon(iid), cell)
         # dragged from shop
-        self.drag.draw(surf, pg.mouse.get_pos())
+        self.drag.draw(surf, mouse_pos())
         # NEW: store hover state instead of drawing tooltip now
         self._hover_item_id = hover_item
         self._hover_mouse = mouse
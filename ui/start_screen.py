@@ -119,7 +119,6 @@ class StartScreen:
         elif self.mode == "NEW_SLOT":
             draw_text(surf, f"New Game: {self.pending_class} / {self.name_buffer}", 440, 210, GOLD, FONT_BIG)
             draw_text(surf, "Select Save Slot (ENTER confirm / ESC back)", 440, 244, SILVER, FONT)
-            self.saves = list_saves()
             for i,(slot,present,meta) in enumerate(self.saves):
                 y = 290 + i*70
                 rect = pygame.Rect(420, y-18, 640, 60)
@@ -133,7 +132,6 @@ class StartScreen:
                     draw_text(surf, f"Slot {slot}: (Empty)", rect.x + 20, y, SILVER, FONT_BIG)
         elif self.mode == "LOAD":
             draw_text(surf, "Load Game (ENTER load, ESC back)", 440, 220, SILVER, FONT_BIG)
-            self.saves = list_saves()
             for i,(slot,present,meta) in enumerate(self.saves):
                 y = 270 + i*74
                 rect = pygame.Rect(420, y-14, 640, 60)
@@ -1,59 +1,128 @@
 # ground.py
-import time
+import heapq
 import pygame as pg
-from typing import List, Optional, Tuple, Dict
+from typing import List, Optional, Tuple, Dict, Iterator
 from settings import draw_text, WHITE
-from data.inventory import ITEMS
+from ui.icon_atlas import icon_for
+from core.session import now
+from data.inventory import DYNAMIC_ITEMS
 
 CELL = 56
-
-def _icon_for(item_id: str) -> pg.Surface:
-    """Temporary square icon keyed by item kind + first letters."""
-    # quick placeholder icon: colored square with 2-letter tag
-    s = pg.Surface((CELL, CELL), pg.SRCALPHA)
-    kind = ITEMS[item_id].kind
-    color = {"consumable": (170, 60, 60),
-             "spell_tome": (120, 70, 150),
-             "equipment": (170, 140, 60)}.get(kind, (90, 120, 180))
-    s.fill(color)
-    pg.draw.rect(s, (0,0,0), s.get_rect(), 2, border_radius=6)
-    tag = ITEMS[item_id].name[:2].upper()
-    draw_text(s, tag, 8, 6, WHITE)
-    return s
+BUCKET = 128  # spatial hash cell (px); >= CELL so a point pick touches at most 4 buckets
 
 class GroundItem:
     def __init__(self, pos: Tuple[int,int], item_id: str, count: int, ttl: float=60.0):
         self.pos = pg.Vector2(*pos)
         self.item_id = item_id
         self.count = count
-        self.spawn = time.time()
+        self.spawn = now()
         self.ttl = ttl
         self.rect = pg.Rect(int(self.pos.x) - CELL//2, int(self.pos.y) - CELL//2, CELL, CELL)
-        self.icon = _icon_for(item_id)
+        self.seq = 0  # drop order, assigned by GroundManager
+
+    @property
+    def icon(self) -> pg.Surface:
+        # Looked up per draw: dynamic atlas cells may be recycled
+        return icon_for(self.item_id)
 
     @property
     def expired(self) -> bool:
-        return (time.time() - self.spawn) >= self.ttl
+        return (now() - self.spawn) >= self.ttl
 
 class GroundManager:
+    """
+    Dropped stacks indexed by a spatial hash (bucket -> items) for point/radius queries,
+    with an expiry min-heap so update() only touches stacks that are actually due.
+    `items` iterates live stacks in drop order (oldest first, i.e. draw order).
+    """
     def __init__(self):
-        self.items: List[GroundItem] = []
+        self._live: Dict[int, GroundItem] = {}                     # seq -> item
+        self._grid: Dict[Tuple[int,int], List[GroundItem]] = {}    # bucket -> items
+        self._heap: List[Tuple[float, int]] = []                   # (expires_at, seq); lazy deletes
+        self._seq = 0
+        self._refs = DYNAMIC_ITEMS.holder(self)                    # one ref per stack
+
+    @property
+    def items(self):
+        return self._live.values()
+
+    def __len__(self): return len(self._live)
+
+    @staticmethod
+    def _bucket(x: float, y: float) -> Tuple[int,int]:
+        return (int(x) // BUCKET, int(y) // BUCKET)
+
+    def _near(self, x0: float, y0: float, x1: float, y1: float) -> Iterator[GroundItem]:
+        bx0, by0 = self._bucket(x0, y0); bx1, by1 = self._bucket(x1, y1)
+        for bx in range(bx0, bx1 + 1):
+            for by in range(by0, by1 + 1):
+                yield from self._grid.get((bx, by), ())
 
     def drop(self, pos: Tuple[int,int], item_id: str, count: int=1, ttl: float=60.0):
-        self.items.append(GroundItem(pos, item_id, count, ttl))
+        g = GroundItem(pos, item_id, count, ttl)
+        self._seq += 1; g.seq = self._seq
+        self._live[g.seq] = g
+        self._grid.setdefault(self._bucket(g.pos.x, g.pos.y), []).append(g)
+        heapq.heappush(self._heap, (g.spawn + g.ttl, g.seq))
+        self._refs.hold(item_id)
+        return g
+
+    def remove(self, g: GroundItem):
+        if self._live.pop(g.seq, None) is None: return
+        self._refs.release(g.item_id)
+        key = self._bucket(g.pos.x, g.pos.y)
+        bucket = self._grid[key]
+        bucket.remove(g)
+        if not bucket: del self._grid[key]
+        # heap entry is dropped lazily; rebuild if stale entries pile up (pick/re-drop churn)
+        if len(self._heap) > 2 * len(self._live) + 64:
+            self._heap = [(x.spawn + x.ttl, x.seq) for x in self._live.values()]
+            heapq.heapify(self._heap)
 
-    def update(self):
-        self.items = [g for g in self.items if not g.expired]
+    def update(self, t: Optional[float] = None):
+        t = now() if t is None else t
+        heap = self._heap
+        while heap and heap[0][0] <= t:
+            _, seq = heapq.heappop(heap)
+            g = self._live.get(seq)
+            if g is not None: self.remove(g)
 
     def draw(self, surf: pg.Surface):
         for g in self.items:
-            surf.blit(g.icon, g.rect)
-            if g.count > 1:
-                draw_text(surf, f"x{g.count}", g.rect.x + 6, g.rect.y + CELL - 18, WHITE)
+            self.draw_item(surf, g)
+
+    def draw_item(self, surf: pg.Surface, g: GroundItem):
+        surf.blit(g.icon, g.rect)
+        if g.count > 1:
+            draw_text(surf, f"x{g.count}", g.rect.x + 6, g.rect.y + CELL - 18, WHITE)
+
+    def item_at(self, pos: Tuple[int,int]) -> Optional[GroundItem]:
+        """Oldest stack whose rect contains pos."""
+        x, y = pos; h = CELL // 2
+        hits = [g for g in self._near(x - h, y - h, x + h, y + h) if g.rect.collidepoint(pos)]
+        return min(hits, key=lambda g: g.seq) if hits else None
+
+    def query_radius(self, pos: Tuple[float,float], radius: float) -> List[GroundItem]:
+        """Stacks whose center is within radius of pos, in drop order."""
+        x, y = pos; r2 = radius * radius
+        out = [g for g in self._near(x - radius, y - radius, x + radius, y + radius)
+               if (g.pos.x - x)**2 + (g.pos.y - y)**2 <= r2]
+        out.sort(key=lambda g: g.seq)
+        return out
+
+    def nearest(self, pos: Tuple[float,float], radius: float) -> Optional[GroundItem]:
+        x, y = pos
+        best = None; best_d2 = radius * radius
+        for g in self.query_radius(pos, radius):
+            d2 = (g.pos.x - x)**2 + (g.pos.y - y)**2
+            if d2 <= best_d2:
+                best, best_d2 = g, d2
+        return best
+
+    def take(self, g: GroundItem) -> Tuple[str,int]:
+        self.remove(g)
+        return (g.item_id, g.count)
 
     def pick_at(self, pos: Tuple[int,int]) -> Optional[Tuple[str,int]]:
-        for i, g in enumerate(self.items):
-            if g.rect.collidepoint(pos):
-                self.items.pop(i)
-                return (g.item_id, g.count)
-        return None
+        g = self.item_at(pos)
+        return self.take(g) if g else None